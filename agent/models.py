@@ -18,14 +18,56 @@ from schema import (
 )
 
 
+class PageSummary(BaseModel):
+    """
+    Summary of the regulation pages that went through extraction.
+    """
+
+    page_count: int
+    # SHA-256 over the text of all pages, in page order
+    text_hash: str
+
+
 class ComplianceCheckAgentState(BaseModel):
     report_name: str
     part: Part
     file_path: str
+    # SHA-256 of the regulation document at file_path
+    document_hash: str | None = None
+    # Maximum number of LLM requests in flight at once
+    max_concurrency: int = 4
+    # If set, substance mappings of several parts are batched into requests of
+    # at most this many tokens instead of one request per part
+    mapping_token_budget: int | None = None
+    # If set, the mappings of the whole BOM and all jurisdictions are checked in
+    # vectorized passes as they complete (see check_compliance_many)
+    vectorized_compliance: bool = False
+    # If set, part substances given as an absolute mass are checked against
+    # concentration limits as their mass fraction of the part that lists them,
+    # otherwise they are reported as not comparable
+    mass_fractions: bool = False
+    # If set, one flat NDJSON record per (jurisdiction, part) is written to this
+    # file as soon as the part and its BOM are evaluated, and the result trees
+    # are not kept in jurisdiction_compliance_results
+    ndjson_path: str | None = None
+    # If set, consecutive pages are packed into extraction prompts of at most
+    # this many tokens instead of one prompt per page
+    extraction_token_budget: int | None = None
+    # If set, annex-style limit lists are parsed locally (see
+    # agent/utils/annex_parser.py) and only the rest is sent to the LLM
+    parse_annex_tables: bool = False
+    # If set, pages that score as irrelevant (see agent/utils/page_filter.py)
+    # are not sent to the LLM extraction
+    filter_pages: bool = False
+    # If set, extracted pages are not kept in the state, only page_summary is
+    lean_state: bool = False
     pages: list[Document] = []
+    page_summary: PageSummary | None = None
     jurisdictions: list[Jurisdiction] = []
     jurisdiction_compliance_results: list[JurisdictionPartComplianceResult] = []
     compliance_report: ComplianceReport | None = None
+    # Counters collected during the run (e.g. cache hits and misses) keyed by source
+    run_stats: dict[str, dict[str, int | float]] = {}
 
 
 class Jurisdictions(BaseModel):
@@ -73,3 +115,34 @@ class SubstanceMappingList(BaseModel):
         [],
         description="List of mappings (list[SubstanceMapping]) between jurisdiction and part substances",
     )
+
+
+class PartSubstanceMappings(BaseModel):
+    part_id: str = Field(
+        ..., description="The part_id of the part, exactly as given in the input"
+    )
+    mappings: list[SubstanceMapping] = Field(
+        [],
+        description="List of mappings (list[SubstanceMapping]) between jurisdiction and this part's substances",
+    )
+
+
+class BatchSubstanceMappingList(BaseModel):
+    parts: list[PartSubstanceMappings] = Field(
+        [],
+        description="The substance mappings of every part in the request, one entry per part",
+    )
+
+
+class ComplianceFlip(BaseModel):
+    """
+    A part whose compliance status changed when the substance tolerances of a
+    jurisdiction changed, found by re-checking a previous result.
+    """
+
+    report_name: str
+    part_id: str
+    part_name: str
+    jurisdiction_name: str
+    was_compliant: bool | None
+    is_compliant: bool | None
@@ -1,23 +1,48 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
 from operator import gt, lt
-from typing import Tuple
+from typing import Any, Callable, NamedTuple, Tuple
+
+import numpy as np
 
 from dotenv import load_dotenv
 from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import PromptTemplate
+from langchain_core.exceptions import OutputParserException
 from langchain_google_genai.chat_models import ChatGoogleGenerativeAI
 
-from agent.models import Jurisdictions, SubstanceMapping, SubstanceMappingList
+from agent.models import (
+    BatchSubstanceMappingList,
+    Jurisdictions,
+    SubstanceMapping,
+    SubstanceMappingList,
+)
 from agent.prompts import (
+    JURISDICTION_BATCH_PART_SUBSTANCE_MAPPING,
     JURISDICTION_PART_SUBSTANCE_MAPPING,
     JURISDICTION_SUBSTANCE_EXTRACTION,
 )
+from agent.utils.bom_store import BOMStore
+from agent.utils.cache import ResultCache, make_key
+from agent.utils.chunking import estimate_tokens
 from agent.utils.compliance_utils import make_compliant, make_violation
+from agent.utils.jurisdiction_index import JurisdictionIndex
+from agent.utils.part_mass import (
+    has_absolute_amounts,
+    is_mass_fraction_check,
+    mass_fraction,
+    own_mass,
+)
+from agent.utils.regulation_delta import ToleranceDelta, tolerance_delta
+from agent.utils.substance_resolver import SubstanceResolver, merge_mappings
 from agent.utils.unit_converter import UnitConverter
 from schema import (
     CompliantSubstance,
     Jurisdiction,
     JurisdictionPartComplianceResult,
     Part,
+    Substance,
+    Tolerance,
     Violation,
 )
 
@@ -32,6 +57,11 @@ ops = {
     "eq": lambda a, b: a != b,  # violation if unequal
 }
 
+# Persistent caches shared by all runs
+mapping_cache = ResultCache("substance_mappings")
+document_cache = ResultCache("document_jurisdictions")
+page_cache = ResultCache("page_jurisdictions")
+
 
 def extract_jurisdiction(text: str) -> list[Jurisdiction]:
     """
@@ -53,6 +83,15 @@ def extract_jurisdiction(text: str) -> list[Jurisdiction]:
             Returns an empty list if no jurisdictions are found.
     """
 
+    # Pages are cached by their whitespace-normalized text, so an amended
+    # document only sends the pages that actually changed to the LLM
+    cache_key = make_key(
+        " ".join(text.split()), MODEL, JURISDICTION_SUBSTANCE_EXTRACTION
+    )
+    cached = page_cache.get(cache_key)
+    if cached is not None:
+        return Jurisdictions.model_validate_json(cached).jurisdictions
+
     # Initialize a parser that enforces output in the form of Jurisdictions
     parser = PydanticOutputParser(pydantic_object=Jurisdictions)
     # Load the extraction prompt template
@@ -63,6 +102,7 @@ def extract_jurisdiction(text: str) -> list[Jurisdiction]:
     result: Jurisdictions = chain.invoke(
         {"text": text, "format_instructions": parser.get_format_instructions()}
     )
+    page_cache.set(cache_key, result.model_dump_json())
 
     # Return empty list if no jurisdiction were detected
     if not result.jurisdictions:
@@ -73,6 +113,46 @@ def extract_jurisdiction(text: str) -> list[Jurisdiction]:
     return [juridiction for juridiction in result.jurisdictions]
 
 
+def document_cache_key(
+    document_hash: str,
+    filter_pages: bool = False,
+    parse_annex_tables: bool = False,
+    extraction_token_budget: int | None = None,
+) -> str:
+    """
+    Cache key for the merged jurisdictions of a regulation document, derived from
+    the document's SHA-256, the model, the extraction prompt and the extraction
+    options, which change what is extracted from the same document.
+    """
+    return make_key(
+        document_hash,
+        MODEL,
+        JURISDICTION_SUBSTANCE_EXTRACTION,
+        filter_pages,
+        parse_annex_tables,
+        extraction_token_budget,
+    )
+
+
+def mapping_cache_key(
+    part: Part,
+    jurisidiction: Jurisdiction,
+    prompt: str = JURISDICTION_PART_SUBSTANCE_MAPPING,
+) -> str:
+    """
+    Cache key for the substance mappings of a part. The mapping only depends on
+    the substances, prompt and model, so identical parts (shared sub-assemblies,
+    re-runs) are answered from the cache. `prompt` is the template the mappings
+    were requested with.
+    """
+    return make_key(
+        MODEL,
+        prompt,
+        sorted(s.model_dump_json() for s in part.substances),
+        sorted(s.model_dump_json() for s in jurisidiction.substance_tolerances),
+    )
+
+
 def get_substance_mappings(
     part: Part, jurisidiction: Jurisdiction
 ) -> list[SubstanceMapping]:
@@ -89,6 +169,11 @@ def get_substance_mappings(
         to the appropriate jurisdiction substance, including tolerance details.
     """
 
+    cache_key = mapping_cache_key(part, jurisidiction)
+    cached = mapping_cache.get(cache_key)
+    if cached is not None:
+        return SubstanceMappingList.model_validate_json(cached).mappings
+
     # Parser to enforce structured output in the form of SubstanceMappings
     parser = PydanticOutputParser(pydantic_object=SubstanceMappingList)
     # Prepare the prompt template for jurisdiction-part substance mapping
@@ -104,12 +189,135 @@ def get_substance_mappings(
             "format_instructions": parser.get_format_instructions(),
         }
     )
+    mapping_cache.set(cache_key, result.model_dump_json())
 
     return result.mappings
 
 
+def pack_batches(
+    parts: list[Part], jurisidiction: Jurisdiction, token_budget: int
+) -> list[list[int]]:
+    """
+    Greedily pack consecutive parts into batches whose batched mapping prompt
+    stays within `token_budget` tokens. Every batch holds at least one part.
+
+    Returns:
+        list[list[int]]: The indices into `parts` of each batch.
+    """
+
+    # The prompt and the jurisdiction substance list are paid once per batch
+    base_tokens = estimate_tokens(JURISDICTION_BATCH_PART_SUBSTANCE_MAPPING)
+    base_tokens += estimate_tokens(str(jurisidiction.substance_tolerances))
+    batches: list[list[int]] = []
+    batch_tokens = base_tokens
+    for index, part in enumerate(parts):
+        part_tokens = estimate_tokens(str(part.substances))
+        if batches and batch_tokens + part_tokens <= token_budget:
+            batches[-1].append(index)
+            batch_tokens += part_tokens
+        else:
+            batches.append([index])
+            batch_tokens = base_tokens + part_tokens
+    return batches
+
+
+def get_batch_substance_mappings(
+    parts: list[Part], jurisidiction: Jurisdiction
+) -> list[list[SubstanceMapping]]:
+    """
+    Generate substance mappings for several parts with a single LLM request.
+
+    Cached parts are answered from the cache, the remaining ones are sent in one
+    batched prompt and the response is split back out by part. Any part whose
+    response is missing or does not map every one of its substances falls back
+    to a dedicated `get_substance_mappings` call.
+
+    Args:
+        parts (list[Part]): The parts whose substances should be mapped.
+        jurisidiction (Jurisdiction): The jurisdiction specifying regulated substances
+            and their tolerances.
+
+    Returns:
+        list[list[SubstanceMapping]]: The mappings of each part, in the order of `parts`.
+    """
+
+    results: list[list[SubstanceMapping] | None] = [None] * len(parts)
+    for index, part in enumerate(parts):
+        cached = mapping_cache.get(
+            mapping_cache_key(
+                part, jurisidiction, JURISDICTION_BATCH_PART_SUBSTANCE_MAPPING
+            )
+        )
+        if cached is not None:
+            results[index] = SubstanceMappingList.model_validate_json(cached).mappings
+    pending = [index for index, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
+    # Parser to enforce structured output in the form of BatchSubstanceMappingList
+    parser = PydanticOutputParser(pydantic_object=BatchSubstanceMappingList)
+    template = PromptTemplate.from_template(JURISDICTION_BATCH_PART_SUBSTANCE_MAPPING)
+    # Chain: prompt -> LLM -> structured parser
+    chain = template | llm | parser
+
+    try:
+        # Parts are identified by their position in the batch, since part ids
+        # are not guaranteed to be unique within a BOM
+        result: BatchSubstanceMappingList = chain.invoke(
+            {
+                "jurisidiction_substances": jurisidiction.substance_tolerances,
+                "parts": "\n".join(
+                    f"- part_id: {index}\n  substances: {parts[index].substances}"
+                    for index in pending
+                ),
+                "format_instructions": parser.get_format_instructions(),
+            }
+        )
+        returned = {entry.part_id.strip(): entry.mappings for entry in result.parts}
+    except OutputParserException:
+        returned = {}
+
+    for index in pending:
+        part = parts[index]
+        mappings = returned.get(str(index))
+        # Every part substance must come back mapped exactly once
+        if mappings is not None and sorted(
+            m.part_substance.name for m in mappings
+        ) == sorted(s.name for s in part.substances):
+            mapping_cache.set(
+                mapping_cache_key(
+                    part, jurisidiction, JURISDICTION_BATCH_PART_SUBSTANCE_MAPPING
+                ),
+                SubstanceMappingList(mappings=mappings).model_dump_json(),
+            )
+            results[index] = mappings
+        else:
+            results[index] = get_substance_mappings(part, jurisidiction)
+
+    return results
+
+
+class SubstanceCheck(NamedTuple):
+    """
+    Intermediate result of checking one part substance, turned into a
+    `Violation` or `CompliantSubstance` by `build_records`. The part value and
+    unit are the normalized ones, the part substance itself is never modified.
+    """
+
+    part_substance: Substance
+    jurisidiction_substance: Substance | None
+    value: float | None
+    unit: str | None
+    # True for a violation, False if compliant, None if ambiguous
+    violated: bool | None
+    # Violation reason or compliance note
+    message: str
+
+
 def check_compliance(
     mappings: list[SubstanceMapping],
+    index: JurisdictionIndex | None = None,
+    part_mass: float | None = None,
 ) -> Tuple[list[Violation], list[CompliantSubstance]]:
     """
     Evaluate compliance of part substances against jurisdictional tolerances.
@@ -122,10 +330,22 @@ def check_compliance(
     - **CompliantSubstance**: Substances that comply, are ambiguous (due to missing
       regulation or undefined tolerance condition), or have no jurisdiction match.
 
+    The mappings and their substances are not modified, so parts and mappings
+    can be shared between concurrent checks (see `check_substances`).
+
     Args:
         mappings (List[SubstanceMapping]):
             A list of mappings between part substances and their corresponding
             jurisdiction substances.
+        index (JurisdictionIndex | None):
+            Index of the jurisdiction's substances. When given, mapped jurisdiction
+            substances are replaced by the jurisdiction's own entry, so tolerances
+            are always taken from the regulation rather than the LLM's copy.
+        part_mass (float | None):
+            Mass in kg of the part itself (see agent/utils/part_mass.py).
+            When given, substances listed as an absolute mass are checked against
+            concentration limits as their mass fraction of the part, unless the
+            mass is made up only of those substances (see `fraction_mass`).
 
     Raises:
         ValueError: If a required value (concentration) for part or jurisdiction
@@ -140,44 +360,108 @@ def check_compliance(
             - A list of compliant or ambiguous substances, including notes where relevant.
     """
 
-    violations: list[Violation] = []
-    compliant_substances: list[CompliantSubstance] = []
+    return build_records(check_substances(mappings, index, part_mass))
+
 
+def fraction_mass(
+    mappings: list[SubstanceMapping],
+    index: JurisdictionIndex | None = None,
+    part_mass: float | None = None,
+) -> float | None:
+    """
+    The part mass to check a part's absolute amounts against concentration
+    limits with, or None if it is unknown or made up only of the amounts checked
+    that way. Such a part lists restricted amounts rather than its composition,
+    so every fraction would be overstated (a part listing only its lead would
+    be 100 % lead).
+    """
+
+    if part_mass is None:
+        return None
+    checked = 0.0
     for mapping in mappings:
+        jurisidiction_substance = mapping.jurisidiction_substance
+        if jurisidiction_substance is None:
+            continue
+        if index is not None:
+            jurisidiction_substance = (
+                index.find(jurisidiction_substance) or jurisidiction_substance
+            )
+        if is_mass_fraction_check(mapping.part_substance, jurisidiction_substance):
+            checked += UnitConverter.convert(
+                mapping.part_substance.value, mapping.part_substance.unit, "kg"
+            )
+    # Relative tolerance for the rounding of the sums of `own_mass`
+    return part_mass if part_mass - checked > 1e-9 * part_mass else None
+
+
+def check_substances(
+    mappings: list[SubstanceMapping],
+    index: JurisdictionIndex | None = None,
+    part_mass: float | None = None,
+) -> list[SubstanceCheck]:
+    """
+    Check every mapping as `check_compliance` does, returning lightweight
+    `SubstanceCheck` records instead of pydantic objects.
+    """
 
-        print(mapping)
+    checks: list[SubstanceCheck] = []
+    part_mass = fraction_mass(mappings, index, part_mass)
 
+    for mapping in mappings:
         part_substance = mapping.part_substance
         jurisidiction_substance = mapping.jurisidiction_substance
+        if index is not None and jurisidiction_substance is not None:
+            jurisidiction_substance = (
+                index.find(jurisidiction_substance) or jurisidiction_substance
+            )
+        value = part_substance.value
+        unit = part_substance.unit
 
         # Case 1: No jurisdiction regulation for the given substance
         if jurisidiction_substance is None:
-            compliant_substances.append(
-                make_compliant(
+            checks.append(
+                SubstanceCheck(
                     part_substance,
                     None,
-                    True,
-                    note=f"No regulation for {part_substance.name} was found in the given jurisdiction",
+                    value,
+                    unit,
+                    None,
+                    f"No regulation for {part_substance.name} was found in the given jurisdiction",
                 )
             )
             continue
 
-        # Case 2: Part and Jurisdiction susbtances are not comparable
-        if not mapping.is_comparable:
-            compliant_substances.append(
-                make_compliant(
+        # Case 2: An absolute amount of a substance limited by concentration is
+        # compared as its mass fraction of the part
+        is_comparable = mapping.is_comparable
+        if part_mass is not None and is_mass_fraction_check(
+            part_substance, jurisidiction_substance
+        ):
+            value = mass_fraction(
+                part_substance, part_mass, jurisidiction_substance.unit
+            )
+            unit = jurisidiction_substance.unit
+            is_comparable = True
+
+        # Case 3: Part and Jurisdiction susbtances are not comparable
+        if not is_comparable:
+            checks.append(
+                SubstanceCheck(
                     part_substance,
                     jurisidiction_substance,
-                    True,
-                    note=f"The part substance ({part_substance.name}, {part_substance.value}{part_substance.unit}) and the jurisdiction substance ({jurisidiction_substance.name}, {jurisidiction_substance.value}{jurisidiction_substance.unit}) are not directly comparable. They differ in substance identity, measurement basis, or units of measure.",
+                    value,
+                    unit,
+                    None,
+                    f"The part substance ({part_substance.name}, {part_substance.value}{part_substance.unit}) and the jurisdiction substance ({jurisidiction_substance.name}, {jurisidiction_substance.value}{jurisidiction_substance.unit}) are not directly comparable. They differ in substance identity, measurement basis, or units of measure.",
                 )
             )
             continue
 
-        # Case 3: Validate that both part and jurisdiction substances have values/units
-        if part_substance.value is None:
+        # Case 4: Validate that both part and jurisdiction substances have values/units
+        if value is None:
             raise ValueError(f"{part_substance.name} part substance value is not known")
-        if part_substance.unit is None:
+        if unit is None:
             raise ValueError(f"{part_substance.unit} part substance unit is not known")
         # Validate that jurisidiction substance have values/unit
 
@@ -187,11 +471,14 @@ def check_compliance(
             jurisidiction_substance.value == 0.0
             and jurisidiction_substance.unit is None
         ):
-            violations.append(
-                make_violation(
+            checks.append(
+                SubstanceCheck(
                     part_substance,
                     jurisidiction_substance,
-                    reason=f"The {part_substance.name} substance is not permitted in the given jurisdiction",
+                    value,
+                    unit,
+                    True,
+                    f"The {part_substance.name} substance is not permitted in the given jurisdiction",
                 )
             )
             continue
@@ -205,52 +492,216 @@ def check_compliance(
                 f"{jurisidiction_substance.name} jurisdiction substance unit is not known"
             )
 
-        # Case 4: Normalize units by converting part substance units to match jurisdiction units
-        part_substance.value = UnitConverter.convert(
-            part_substance.value,
-            part_substance.unit,
-            jurisidiction_substance.unit,
-        )
-        part_substance.unit = jurisidiction_substance.unit
+        # Case 5: Normalize units by converting part substance units to match jurisdiction units
+        value = UnitConverter.convert(value, unit, jurisidiction_substance.unit)
 
-        # Case 5: Retrieve tolerance condition operator (e.g., <=, >=, <, >)
+        # Case 6: Retrieve tolerance condition operator (e.g., <=, >=, <, >)
         tolerance_condition = jurisidiction_substance.tolerance_condition
         check = ops.get(tolerance_condition) if tolerance_condition else None
+        violated = (
+            None if check is None else check(value, jurisidiction_substance.value)
+        )
+        checks.append(
+            tolerance_check(part_substance, jurisidiction_substance, value, violated)
+        )
+
+    return checks
 
-        if check is None:
-            # No defined tolerance -> ambiguous compliance
-            compliant_substances.append(
-                make_compliant(
-                    part_substance,
-                    jurisidiction_substance,
-                    ambiguous=True,
-                    note=f"{jurisidiction_substance.name} does not have any specified tolerance in the given jurisdiction",
-                )
-            )
-        elif check(part_substance.value, jurisidiction_substance.value):
-            # Substance violates the jurisdiction tolerance
-            if tolerance_condition == "gte":
-                violation_reason = f"Substance {part_substance.name} does not meet minimum requirements of the jurisdiction"
-            else:
-                violation_reason = f"Substance {part_substance.name} exceeds permisible limits of the jurisdiction"
 
+def tolerance_check(
+    part_substance: Substance,
+    jurisidiction_substance: Substance,
+    value: float,
+    violated: bool | None,
+) -> SubstanceCheck:
+    """
+    Build the result of comparing a part substance, whose value normalized to
+    the jurisdiction unit is `value`, against a jurisdiction tolerance.
+    `violated` is None when the tolerance has no comparison condition, which
+    makes the result ambiguous.
+    """
+
+    if violated is None:
+        # No defined tolerance -> ambiguous compliance
+        message = f"{jurisidiction_substance.name} does not have any specified tolerance in the given jurisdiction"
+    elif violated:
+        # Substance violates the jurisdiction tolerance
+        if jurisidiction_substance.tolerance_condition == "gte":
+            message = f"Substance {part_substance.name} does not meet minimum requirements of the jurisdiction"
+        else:
+            message = f"Substance {part_substance.name} exceeds permisible limits of the jurisdiction"
+    else:
+        # Substance complies with jurisdiction tolerance
+        message = f"Substance {part_substance.name} passes the requirements of the given jurisdiction."
+    return SubstanceCheck(
+        part_substance,
+        jurisidiction_substance,
+        value,
+        jurisidiction_substance.unit,
+        violated,
+        message,
+    )
+
+
+def build_records(
+    checks: list[SubstanceCheck],
+) -> Tuple[list[Violation], list[CompliantSubstance]]:
+    """
+    Build the `Violation` and `CompliantSubstance` records of a part's checks,
+    every record with its own `Tolerance` objects.
+
+    Args:
+        checks (list[SubstanceCheck]): The checks of the part, in order.
+    """
+
+    violations: list[Violation] = []
+    compliant_substances: list[CompliantSubstance] = []
+    for check in checks:
+        concentration = Tolerance(
+            value=check.value, unit=check.unit, tolerance_condition=None
+        )
+        if check.violated:
             violations.append(
                 make_violation(
-                    part_substance, jurisidiction_substance, violation_reason
+                    check.part_substance,
+                    check.jurisidiction_substance,
+                    check.message,
+                    concentration,
                 )
             )
         else:
-            # Substance complies with jurisdiction tolerance
             compliant_substances.append(
                 make_compliant(
+                    check.part_substance,
+                    check.jurisidiction_substance,
+                    check.violated is None,
+                    check.message,
+                    concentration,
+                )
+            )
+    return violations, compliant_substances
+
+
+# Condition codes of the vectorized check, the last one means "no condition"
+CONDITION_CODES = {"gte": 0, "lte": 1, "eq": 2}
+NO_CONDITION = len(CONDITION_CODES)
+
+
+def check_compliance_many(
+    mapping_lists: list[list[SubstanceMapping]],
+    indexes: list[JurisdictionIndex | None] | None = None,
+    masses: list[float | None] | None = None,
+) -> list[Tuple[list[Violation], list[CompliantSubstance]]]:
+    """
+    Vectorized equivalent of `check_compliance` over many mapping lists at once
+    (e.g. every part of a BOM for every jurisdiction).
+
+    Comparable mappings with numeric tolerances are flattened into NumPy columns
+    (value, unit factors, threshold, condition code) and unit conversion and the
+    gte/lte/eq checks run in one vectorized pass. All other mappings (no
+    regulation, not comparable, mass fractions, prohibited or invalid) go through
+    `check_substances`, which also raises the same errors. Result records are
+    only built at the end, and the input substances are not modified.
+
+    Args:
+        mapping_lists (list[list[SubstanceMapping]]): The mappings of each part.
+        indexes (list[JurisdictionIndex | None] | None): The jurisdiction index
+            to use for each mapping list, see `check_compliance`.
+        masses (list[float | None] | None): The part mass to use for each
+            mapping list, see `check_compliance`.
+
+    Returns:
+        list[Tuple[list[Violation], list[CompliantSubstance]]]: The same results
+        `check_compliance` returns for each mapping list, in order.
+    """
+
+    if indexes is None:
+        indexes = [None] * len(mapping_lists)
+    if masses is None:
+        masses = [None] * len(mapping_lists)
+
+    # Per mapping list, in order: either the finished checks of the scalar
+    # path or the row of the mapping in the columns
+    entries: list[list[list[SubstanceCheck] | int]] = []
+    rows: list[Tuple[Substance, Substance]] = []
+    values: list[float] = []
+    from_factors: list[float] = []
+    to_factors: list[float] = []
+    thresholds: list[float] = []
+    codes: list[int] = []
+
+    for mappings, index, part_mass in zip(mapping_lists, indexes, masses):
+        part_mass = fraction_mass(mappings, index, part_mass)
+        list_entries = []
+        for mapping in mappings:
+            part_substance = mapping.part_substance
+            jurisidiction_substance = mapping.jurisidiction_substance
+            if index is not None and jurisidiction_substance is not None:
+                jurisidiction_substance = (
+                    index.find(jurisidiction_substance) or jurisidiction_substance
+                )
+            if (
+                jurisidiction_substance is None
+                or not mapping.is_comparable
+                or part_substance.value is None
+                or part_substance.unit is None
+                or jurisidiction_substance.value is None
+                or jurisidiction_substance.unit is None
+                or (
+                    part_mass is not None
+                    and is_mass_fraction_check(part_substance, jurisidiction_substance)
+                )
+            ):
+                list_entries.append(check_substances([mapping], index, part_mass))
+                continue
+
+            factor_from, factor_to = UnitConverter.factors(
+                part_substance.unit, jurisidiction_substance.unit
+            )
+            list_entries.append(len(rows))
+            rows.append((part_substance, jurisidiction_substance))
+            values.append(part_substance.value)
+            from_factors.append(factor_from)
+            to_factors.append(factor_to)
+            thresholds.append(jurisidiction_substance.value)
+            codes.append(
+                CONDITION_CODES.get(
+                    jurisidiction_substance.tolerance_condition, NO_CONDITION
+                )
+            )
+        entries.append(list_entries)
+
+    # Convert and check every numeric mapping in one pass
+    converted = np.asarray(values) * np.asarray(from_factors) / np.asarray(to_factors)
+    threshold = np.asarray(thresholds)
+    code = np.asarray(codes, dtype=np.int8)
+    violated = np.select(
+        [code == 0, code == 1, code == 2],
+        [converted < threshold, converted > threshold, converted != threshold],
+        default=False,
+    )
+    converted_values = converted.tolist()
+    violated_flags = violated.tolist()
+    has_condition = (code != NO_CONDITION).tolist()
+
+    results: list[Tuple[list[Violation], list[CompliantSubstance]]] = []
+    for list_entries in entries:
+        checks: list[SubstanceCheck] = []
+        for entry in list_entries:
+            if isinstance(entry, list):
+                checks.extend(entry)
+                continue
+            part_substance, jurisidiction_substance = rows[entry]
+            checks.append(
+                tolerance_check(
                     part_substance,
                     jurisidiction_substance,
-                    ambiguous=False,
-                    note=f"Substance {part_substance.name} passes the requirements of the given jurisdiction.",
+                    converted_values[entry],
+                    violated_flags[entry] if has_condition[entry] else None,
                 )
             )
-
-    return violations, compliant_substances
+        results.append(build_records(checks))
+    return results
 
 
 def dfs_part_traversal(
@@ -314,3 +765,1107 @@ def dfs_part_traversal(
         compliant_substances=compliant_substances,
         bom_results=bom_results,
     )
+
+
+def compliance_record(
+    part: Part,
+    parent_id: str | None,
+    jurisdiction: Jurisdiction,
+    is_compliant: bool,
+    violations: list[Violation],
+    compliant_substances: list[CompliantSubstance],
+) -> dict[str, Any]:
+    """
+    Build the flat, JSON serializable record of one (jurisdiction, part) result.
+
+    Unlike `JurisdictionPartComplianceResult` the record does not nest the
+    results of the part's BOM, children refer to their parent by `parent_part_id`.
+    `is_compliant` still covers the whole BOM of the part.
+    """
+
+    return {
+        "jurisdiction_name": jurisdiction.name,
+        "part_id": part.id,
+        "part_name": part.name,
+        "parent_part_id": parent_id,
+        "is_compliant": is_compliant,
+        "violations": [violation.model_dump() for violation in violations],
+        "compliant_substances": [
+            substance.model_dump() for substance in compliant_substances
+        ],
+    }
+
+
+class BOMNode(NamedTuple):
+    """
+    A part in a flattened BOM together with the index of its parent node.
+    The root node has a parent index of -1.
+    """
+
+    part: Part
+    parent: int
+
+
+def flatten_bom(part: Part) -> list[BOMNode]:
+    """
+    Flatten a part and its BOM into a pre-order work list.
+
+    Parents always precede their children and siblings keep their BOM order,
+    so iterating the list in reverse visits every child before its parent.
+    """
+
+    nodes: list[BOMNode] = []
+    stack: list[tuple[Part, int]] = [(part, -1)]
+    while stack:
+        current, parent = stack.pop()
+        index = len(nodes)
+        nodes.append(BOMNode(current, parent))
+        # Push children reversed so they are popped in BOM order
+        for child in reversed(current.bom or []):
+            stack.append((child, index))
+    return nodes
+
+
+def dedupe_bom(
+    nodes: list[BOMNode], masses: list[float | None] | None = None
+) -> list[int]:
+    """
+    Find parts whose evaluation can be shared.
+
+    The evaluation of a part only depends on its own substances, so repeated
+    parts (the same screw, PCB or casing under different parents, or whole
+    structurally identical sub-assemblies) produce identical results. With
+    `masses`, parts with absolute amounts must also have the same mass.
+
+    Returns:
+        list[int]: For every node, the index of the first node with exactly the
+        same substances. A node that is its own canonical node must be evaluated.
+    """
+
+    first_seen: dict[str, int] = {}
+    return [
+        first_seen.setdefault(
+            dedupe_key(node.part, None if masses is None else masses[index]), index
+        )
+        for index, node in enumerate(nodes)
+    ]
+
+
+def dedupe_key(part: Part, part_mass: float | None = None) -> str:
+    """Key of the parts sharing an evaluation, see `dedupe_bom`."""
+    return make_key(
+        [s.model_dump_json() for s in part.substances],
+        part_mass if has_absolute_amounts(part) else None,
+    )
+
+
+def subtree_hashes(nodes: list[BOMNode]) -> list[str]:
+    """
+    Hash every node of a flattened BOM together with its whole BOM: the part's
+    id, name and substances and the hashes of its children, in BOM order.
+    Nodes with equal hashes have equal result subtrees for a jurisdiction.
+    """
+
+    children: list[list[int]] = [[] for _ in nodes]
+    for index, node in enumerate(nodes):
+        if node.parent >= 0:
+            children[node.parent].append(index)
+
+    hashes: list[str | None] = [None] * len(nodes)
+    for index in reversed(range(len(nodes))):
+        part = nodes[index].part
+        hashes[index] = make_key(
+            part.id,
+            part.name,
+            dedupe_key(part),
+            [hashes[child] for child in children[index]],
+        )
+    return hashes
+
+
+def map_part(
+    part: Part, jurisdiction: Jurisdiction, resolver: SubstanceResolver | None = None
+) -> list[SubstanceMapping]:
+    """
+    Map the substances of a single part (ignoring its BOM) to a jurisdiction.
+
+    With a `resolver`, substances that can be mapped locally skip the LLM and
+    only the remaining ones are sent to `get_substance_mappings`.
+    """
+
+    if not part.substances:
+        return []
+    if resolver is None:
+        return get_substance_mappings(part, jurisdiction)
+
+    local, leftovers = resolver.resolve(part.substances)
+    llm_mappings: list[SubstanceMapping] = []
+    if leftovers:
+        llm_mappings = get_substance_mappings(
+            part.model_copy(update={"substances": leftovers}), jurisdiction
+        )
+    return merge_mappings(part.substances, local, llm_mappings)
+
+
+def evaluate_part(
+    part: Part,
+    jurisdiction: Jurisdiction,
+    resolver: SubstanceResolver | None = None,
+    part_mass: float | None = None,
+) -> Tuple[list[Violation], list[CompliantSubstance]]:
+    """
+    Check the substances of a single part (ignoring its BOM) against a jurisdiction,
+    see `map_part` and `check_compliance`.
+    """
+
+    return check_compliance(
+        map_part(part, jurisdiction, resolver),
+        resolver.index if resolver else None,
+        part_mass,
+    )
+
+
+def map_parts(
+    parts: list[Part],
+    jurisdiction: Jurisdiction,
+    resolver: SubstanceResolver | None = None,
+) -> list[list[SubstanceMapping]]:
+    """
+    Batched equivalent of `map_part`, mapping all parts with one LLM request.
+    """
+
+    if resolver is None:
+        return get_batch_substance_mappings(parts, jurisdiction)
+
+    resolved = [resolver.resolve(part.substances) for part in parts]
+    # Only parts with unresolved substances take part in the batched request
+    pending = [index for index, (_, leftovers) in enumerate(resolved) if leftovers]
+    llm_mappings: list[list[SubstanceMapping]] = [[] for _ in parts]
+    batch_mappings = get_batch_substance_mappings(
+        [
+            parts[index].model_copy(update={"substances": resolved[index][1]})
+            for index in pending
+        ],
+        jurisdiction,
+    )
+    for index, mappings in zip(pending, batch_mappings):
+        llm_mappings[index] = mappings
+    return [
+        merge_mappings(part.substances, local, mappings)
+        for part, (local, _), mappings in zip(parts, resolved, llm_mappings)
+    ]
+
+
+def evaluate_parts(
+    parts: list[Part],
+    jurisdiction: Jurisdiction,
+    resolver: SubstanceResolver | None = None,
+    masses: list[float | None] | None = None,
+) -> list[Tuple[list[Violation], list[CompliantSubstance]]]:
+    """
+    Batched equivalent of `evaluate_part`, mapping all parts with one LLM request.
+    """
+
+    index = resolver.index if resolver else None
+    if masses is None:
+        masses = [None] * len(parts)
+    return [
+        check_compliance(mappings, index, part_mass)
+        for mappings, part_mass in zip(map_parts(parts, jurisdiction, resolver), masses)
+    ]
+
+
+def split_future(batch_future: Future, size: int) -> list[Future]:
+    """
+    Split a future resolving to a list into one future per list item.
+    """
+
+    futures = [Future() for _ in range(size)]
+
+    def resolve(done: Future):
+        error = done.exception()
+        for index, future in enumerate(futures):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[index])
+
+    batch_future.add_done_callback(resolve)
+    return futures
+
+
+def build_result_tree(
+    nodes: list[BOMNode],
+    jurisdiction: Jurisdiction,
+    evaluations: list[Tuple[list[Violation], list[CompliantSubstance]] | None],
+    spliced: dict[int, JurisdictionPartComplianceResult] | None = None,
+) -> JurisdictionPartComplianceResult:
+    """
+    Rebuild the nested compliance result tree bottom-up from per-node evaluations.
+
+    Args:
+        nodes (list[BOMNode]): The flattened BOM produced by `flatten_bom`.
+        jurisdiction (Jurisdiction): The jurisdiction the nodes were evaluated against.
+        evaluations (list[Tuple[list[Violation], list[CompliantSubstance]] | None]):
+            The violations and compliant substances of each node, in node order.
+        spliced (dict[int, JurisdictionPartComplianceResult] | None): Existing
+            results of whole subtrees by the index of their root node, used as
+            they are. The evaluations of nodes below a spliced root are None.
+
+    Returns:
+        JurisdictionPartComplianceResult: The result for the root part, identical
+        to the one produced by `dfs_part_traversal`.
+    """
+
+    children: list[list[int]] = [[] for _ in nodes]
+    for index, node in enumerate(nodes):
+        if node.parent >= 0:
+            children[node.parent].append(index)
+
+    results: list[JurisdictionPartComplianceResult | None] = [None] * len(nodes)
+    for index in reversed(range(len(nodes))):
+        if spliced and index in spliced:
+            results[index] = spliced[index]
+            continue
+        if evaluations[index] is None:
+            # Below a spliced subtree root
+            continue
+        part = nodes[index].part
+        violations, compliant_substances = evaluations[index]
+        bom_results = [results[child] for child in children[index]]
+        # A part is non compliant if it or any of its children is
+        is_compliant = not violations and all(
+            result.is_compliant is not False for result in bom_results
+        )
+        results[index] = JurisdictionPartComplianceResult(
+            part_id=part.id,
+            part_name=part.name,
+            jurisdiction_name=jurisdiction.name,
+            is_compliant=is_compliant,
+            violations=violations,
+            compliant_substances=compliant_substances,
+            bom_results=bom_results,
+        )
+
+    return results[0]
+
+
+def flatten_results(
+    result: JurisdictionPartComplianceResult,
+) -> list[JurisdictionPartComplianceResult]:
+    """
+    Flatten a result tree in the pre-order of `flatten_bom`, so the results
+    line up with the nodes of the BOM they were built from.
+    """
+
+    results: list[JurisdictionPartComplianceResult] = []
+    stack = [result]
+    while stack:
+        current = stack.pop()
+        results.append(current)
+        stack.extend(reversed(current.bom_results))
+    return results
+
+
+def stream_part_results(
+    nodes: list[BOMNode],
+    jurisdiction: Jurisdiction,
+    futures: list[Future],
+    emit: Callable[[dict[str, Any]], None],
+) -> None:
+    """
+    Emit a `compliance_record` for every node as soon as the node and all of
+    its descendants are evaluated, without waiting for the whole BOM.
+
+    Records are emitted children first, in the order nodes complete, and a
+    node's `is_compliant` accounts for its BOM exactly as in `build_result_tree`.
+    `emit` is called from the threads completing the futures, one call at a time.
+    """
+
+    pending_children = [0] * len(nodes)
+    for node in nodes:
+        if node.parent >= 0:
+            pending_children[node.parent] += 1
+    children_compliant = [True] * len(nodes)
+    evaluations: list[Tuple[list[Violation], list[CompliantSubstance]] | None] = [
+        None
+    ] * len(nodes)
+    lock = threading.Lock()
+
+    def finish(index: int):
+        # Walk up while each completed node was the last one its parent waited for
+        while True:
+            node = nodes[index]
+            violations, compliant_substances = evaluations[index]
+            is_compliant = children_compliant[index] and not violations
+            parent = node.parent
+            emit(
+                compliance_record(
+                    node.part,
+                    nodes[parent].part.id if parent >= 0 else None,
+                    jurisdiction,
+                    is_compliant,
+                    violations,
+                    compliant_substances,
+                )
+            )
+            if parent < 0:
+                return
+            children_compliant[parent] = children_compliant[parent] and is_compliant
+            pending_children[parent] -= 1
+            if pending_children[parent] or evaluations[parent] is None:
+                return
+            index = parent
+
+    def on_done(future: Future, index: int):
+        # Failed evaluations surface when the result tree is built
+        if future.exception() is not None:
+            return
+        with lock:
+            evaluations[index] = future.result()
+            if not pending_children[index]:
+                finish(index)
+
+    for index, future in enumerate(futures):
+        future.add_done_callback(lambda done, index=index: on_done(done, index))
+
+
+def submit_part_evaluations(
+    nodes: list[BOMNode],
+    canonical: list[int],
+    jurisdiction: Jurisdiction,
+    executor: Executor,
+    token_budget: int | None = None,
+    resolver: SubstanceResolver | None = None,
+    mappings_only: bool = False,
+    masses: list[float | None] | None = None,
+) -> list[Future]:
+    """
+    Schedule the evaluation of every canonical node of a flattened BOM (see
+    `dedupe_bom`) without waiting for the results. The returned futures are in
+    node order, duplicate nodes share the future of their canonical node.
+
+    Without a `token_budget` every part is evaluated with its own mapping
+    request, otherwise parts are packed into batched requests of at most
+    `token_budget` tokens (see `pack_batches`). With a `resolver`, substances
+    are mapped locally where possible before any LLM request. With
+    `mappings_only` the futures resolve to the substance mappings of each node
+    and the compliance check is left to the caller. `masses` are the part
+    masses of the nodes passed on to `check_compliance`.
+    """
+
+    evaluate_one, evaluate_many = (
+        (map_part, map_parts) if mappings_only else (evaluate_part, evaluate_parts)
+    )
+    futures: list[Future | None] = [None] * len(nodes)
+    if token_budget is None:
+        for index, node in enumerate(nodes):
+            if canonical[index] == index:
+                futures[index] = executor.submit(
+                    evaluate_one,
+                    node.part,
+                    jurisdiction,
+                    resolver,
+                    *(() if mappings_only or masses is None else (masses[index],)),
+                )
+    else:
+        batched = [
+            index
+            for index, node in enumerate(nodes)
+            if canonical[index] == index and node.part.substances
+        ]
+        batches = pack_batches(
+            [nodes[index].part for index in batched], jurisdiction, token_budget
+        )
+        for batch in batches:
+            indices = [batched[position] for position in batch]
+            batch_future = executor.submit(
+                evaluate_many,
+                [nodes[index].part for index in indices],
+                jurisdiction,
+                resolver,
+                *(
+                    ()
+                    if mappings_only or masses is None
+                    else ([masses[index] for index in indices],)
+                ),
+            )
+            for index, future in zip(indices, split_future(batch_future, len(indices))):
+                futures[index] = future
+        # Parts without substances have nothing to map
+        for index, node in enumerate(nodes):
+            if canonical[index] == index and futures[index] is None:
+                futures[index] = Future()
+                futures[index].set_result([] if mappings_only else ([], []))
+
+    for index in range(len(nodes)):
+        if canonical[index] != index:
+            futures[index] = futures[canonical[index]]
+    return futures
+
+
+def pending_evaluations(canonical: list[int], count: int) -> list[list[Future]]:
+    """
+    Unresolved evaluation futures for `count` jurisdictions, in node order,
+    duplicate nodes sharing the future of their canonical node.
+    """
+
+    futures: list[list[Future | None]] = [[None] * len(canonical) for _ in range(count)]
+    for jurisdiction_futures in futures:
+        for index in range(len(canonical)):
+            jurisdiction_futures[index] = (
+                Future()
+                if canonical[index] == index
+                else jurisdiction_futures[canonical[index]]
+            )
+    return futures
+
+
+def check_scheduled_mappings(
+    canonical: list[int],
+    mapping_futures: list[list[Future]],
+    indexes: list[JurisdictionIndex],
+    futures: list[list[Future]],
+    masses: list[float | None] | None = None,
+) -> None:
+    """
+    Check the mapping futures of every jurisdiction (see `submit_part_evaluations`
+    with `mappings_only`) with `check_compliance_many`, one call per wave of the
+    mappings completed since the previous call, and resolve the evaluation
+    futures of `pending_evaluations` with the results as each wave is checked.
+    """
+
+    owners: dict[Future, list[Tuple[int, int]]] = {}
+    for jurisdiction in range(len(mapping_futures)):
+        for index in range(len(canonical)):
+            if canonical[index] == index:
+                owners.setdefault(mapping_futures[jurisdiction][index], []).append(
+                    (jurisdiction, index)
+                )
+
+    pending = set(owners)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        checked = [owner for future in done for owner in owners[future]]
+        evaluations = check_compliance_many(
+            [
+                mapping_futures[jurisdiction][index].result()
+                for jurisdiction, index in checked
+            ],
+            [indexes[jurisdiction] for jurisdiction, _ in checked],
+            None if masses is None else [masses[index] for _, index in checked],
+        )
+        for (jurisdiction, index), evaluation in zip(checked, evaluations):
+            futures[jurisdiction][index].set_result(evaluation)
+
+
+def parallel_compliance_check(
+    nodes: list[BOMNode],
+    jurisdictions: list[Jurisdiction],
+    executor: Executor,
+    token_budget: int | None = None,
+    emit: Callable[[dict[str, Any]], None] | None = None,
+    vectorized: bool = False,
+    masses: list[float | None] | None = None,
+    build_trees: bool = True,
+) -> list[JurisdictionPartComplianceResult]:
+    """
+    Concurrent equivalent of `dfs_part_traversal`, for several jurisdictions at
+    once. Every part of the flattened BOM is evaluated on the given executor
+    and the result trees are rebuilt bottom-up once all evaluations are done.
+
+    The evaluations of every jurisdiction are submitted before any result is
+    awaited, so all jurisdictions share the executor's concurrency budget
+    instead of being traversed one after another. Repeated parts are evaluated
+    once per jurisdiction, and substances that a `SubstanceResolver` can map
+    locally are not sent to the LLM.
+
+    Args:
+        nodes (list[BOMNode]): The flattened BOM produced by `flatten_bom`.
+        jurisdictions (list[Jurisdiction]): The jurisdictions to check against.
+        executor (Executor): Shared executor bounding the LLM calls in flight.
+        token_budget (int | None): If set, pack the substance mappings of several
+            parts into batched requests of at most this many tokens.
+        emit (Callable[[dict[str, Any]], None] | None): If given, flat records
+            are streamed to it as parts finish (see `stream_part_results`).
+        vectorized (bool): If set, the mappings of all parts and jurisdictions
+            are checked together by `check_compliance_many`, in waves of the
+            mappings completed since the previous wave, instead of part by part.
+        masses (list[float | None] | None): If given, the mass of every node
+            (see agent/utils/part_mass.py), used to check absolute amounts against
+            concentration limits as mass fractions.
+        build_trees (bool): If not set, no result tree is built, the results are
+            only streamed to `emit`.
+
+    Returns:
+        list[JurisdictionPartComplianceResult]: One result tree per jurisdiction,
+        in the same order as `jurisdictions`, or an empty list without
+        `build_trees`.
+    """
+
+    canonical = dedupe_bom(nodes, masses)
+    resolvers = [
+        SubstanceResolver(JurisdictionIndex(jurisdiction.substance_tolerances))
+        for jurisdiction in jurisdictions
+    ]
+    scheduled = [
+        (
+            jurisdiction,
+            submit_part_evaluations(
+                nodes,
+                canonical,
+                jurisdiction,
+                executor,
+                token_budget,
+                resolver,
+                vectorized,
+                masses,
+            ),
+        )
+        for jurisdiction, resolver in zip(jurisdictions, resolvers)
+    ]
+    if vectorized:
+        mapping_futures = [futures for _, futures in scheduled]
+        scheduled = list(
+            zip(jurisdictions, pending_evaluations(canonical, len(jurisdictions)))
+        )
+    if emit is not None:
+        for jurisdiction, futures in scheduled:
+            stream_part_results(nodes, jurisdiction, futures, emit)
+    if vectorized:
+        check_scheduled_mappings(
+            canonical,
+            mapping_futures,
+            [resolver.index for resolver in resolvers],
+            [futures for _, futures in scheduled],
+            masses,
+        )
+    if not build_trees:
+        # Wait for every evaluation, raising the first failure
+        for _, futures in scheduled:
+            for future in futures:
+                future.result()
+        return []
+    return [
+        build_result_tree(nodes, jurisdiction, [future.result() for future in futures])
+        for jurisdiction, futures in scheduled
+    ]
+
+
+def evaluate_store_part(
+    store: BOMStore,
+    index: int,
+    jurisdiction: Jurisdiction,
+    resolver: SubstanceResolver | None = None,
+    mass_fractions: bool = False,
+) -> Tuple[list[Violation], list[CompliantSubstance]]:
+    """
+    `evaluate_part` for part `index` of a `BOMStore`. The part is only built
+    here, inside the evaluation, and dropped once it is evaluated.
+    """
+
+    part = store.part(index)
+    part_mass = (own_mass(part) or None) if mass_fractions else None
+    return evaluate_part(part, jurisdiction, resolver, part_mass)
+
+
+def store_compliance_check(
+    store: BOMStore,
+    jurisdictions: list[Jurisdiction],
+    executor: Executor,
+    mass_fractions: bool = False,
+) -> list[JurisdictionPartComplianceResult]:
+    """
+    Equivalent of `parallel_compliance_check` for a `BOMStore`, without a `Part`
+    per node: parts are deduplicated on the store's substance columns and each
+    canonical part is built by its evaluation task (see `evaluate_store_part`).
+
+    Args:
+        store (BOMStore): The BOM to check.
+        jurisdictions (list[Jurisdiction]): The jurisdictions to check against.
+        executor (Executor): Shared executor bounding the LLM calls in flight.
+        mass_fractions (bool): If set, the mass of every part is passed to
+            `check_compliance` (see agent/utils/part_mass.py).
+
+    Returns:
+        list[JurisdictionPartComplianceResult]: One result tree per jurisdiction,
+        in the same order as `jurisdictions`.
+    """
+
+    resolvers = [
+        SubstanceResolver(JurisdictionIndex(jurisdiction.substance_tolerances))
+        for jurisdiction in jurisdictions
+    ]
+    # The mass of a part only depends on its substances, so equal substance
+    # rows share an evaluation with and without mass fractions
+    first_seen: dict[bytes, int] = {}
+    futures: list[list[Future]] = [[] for _ in jurisdictions]
+    for index in range(len(store)):
+        canonical = first_seen.setdefault(store.substance_key(index), index)
+        for jurisdiction, resolver, jurisdiction_futures in zip(
+            jurisdictions, resolvers, futures
+        ):
+            jurisdiction_futures.append(
+                jurisdiction_futures[canonical]
+                if canonical != index
+                else executor.submit(
+                    evaluate_store_part,
+                    store,
+                    index,
+                    jurisdiction,
+                    resolver,
+                    mass_fractions,
+                )
+            )
+
+    # The result tree only reads the id and name of each node's part
+    nodes = [
+        BOMNode(
+            Part.model_construct(
+                id=store.part_ids[index],
+                name=store.strings[store.part_names[index]],
+            ),
+            parent,
+        )
+        for index, parent in enumerate(store.parents.tolist())
+    ]
+    return [
+        build_result_tree(
+            nodes,
+            jurisdiction,
+            [future.result() for future in jurisdiction_futures],
+        )
+        for jurisdiction, jurisdiction_futures in zip(jurisdictions, futures)
+    ]
+
+
+def revise_compliance_check(
+    previous_nodes: list[BOMNode],
+    previous_results: list[JurisdictionPartComplianceResult],
+    nodes: list[BOMNode],
+    jurisdictions: list[Jurisdiction],
+    executor: Executor,
+    token_budget: int | None = None,
+    masses: list[float | None] | None = None,
+    previous_masses: list[float | None] | None = None,
+) -> Tuple[list[JurisdictionPartComplianceResult], dict[str, int]]:
+    """
+    Incremental equivalent of `parallel_compliance_check` for a revision of a
+    BOM that was already checked against the same jurisdictions.
+
+    Subtrees of the revised BOM that also appear in the previous BOM (see
+    `subtree_hashes`) are spliced in from `previous_results` as they are. Only
+    the remaining nodes, the changed parts and their ancestors, get new
+    results, and of those only the parts whose own substances (and mass) are
+    not found in the previous BOM are evaluated again, the others reuse their
+    previous evaluation.
+
+    Args:
+        previous_nodes (list[BOMNode]): The flattened BOM that was checked.
+        previous_results (list[JurisdictionPartComplianceResult]): Its result
+            trees, one per jurisdiction in the same order as `jurisdictions`.
+        nodes (list[BOMNode]): The flattened revised BOM.
+        jurisdictions (list[Jurisdiction]): The jurisdictions to check against,
+            unchanged since the previous check.
+        executor (Executor): Shared executor bounding the LLM calls in flight.
+        token_budget (int | None): As in `parallel_compliance_check`.
+        masses (list[float | None] | None): The masses of the revised nodes,
+            see `parallel_compliance_check`.
+        previous_masses (list[float | None] | None): The masses of the previous
+            nodes, given if and only if `masses` is.
+
+    Returns:
+        Tuple[list[JurisdictionPartComplianceResult], dict[str, int]]: One result
+        tree per jurisdiction, in the same order as `jurisdictions`, and the
+        number of parts whose results were spliced in, rebuilt and evaluated.
+
+    Raises:
+        ValueError: If the previous results do not match the jurisdictions or
+            the previous BOM.
+    """
+
+    if [result.jurisdiction_name for result in previous_results] != [
+        jurisdiction.name for jurisdiction in jurisdictions
+    ]:
+        raise ValueError("The previous results are not for the given jurisdictions")
+    previous_flat = [flatten_results(result) for result in previous_results]
+    previous_ids = [node.part.id for node in previous_nodes]
+    if any(
+        [result.part_id for result in flat] != previous_ids for flat in previous_flat
+    ):
+        raise ValueError("The previous results do not match the previous BOM")
+
+    previous_subtrees: dict[str, int] = {}
+    for index, subtree in enumerate(subtree_hashes(previous_nodes)):
+        previous_subtrees.setdefault(subtree, index)
+    previous_evaluations: dict[str, int] = {}
+    for index, node in enumerate(previous_nodes):
+        part_mass = None if previous_masses is None else previous_masses[index]
+        previous_evaluations.setdefault(dedupe_key(node.part, part_mass), index)
+
+    # Previous node of every spliced subtree root and of every reused evaluation
+    spliced: dict[int, int] = {}
+    reused: dict[int, int] = {}
+    pending: list[int] = []
+    below_spliced = [False] * len(nodes)
+    for index, (node, subtree) in enumerate(zip(nodes, subtree_hashes(nodes))):
+        parent = node.parent
+        if parent >= 0 and (below_spliced[parent] or parent in spliced):
+            below_spliced[index] = True
+        elif subtree in previous_subtrees:
+            spliced[index] = previous_subtrees[subtree]
+        else:
+            part_mass = None if masses is None else masses[index]
+            previous = previous_evaluations.get(dedupe_key(node.part, part_mass))
+            if previous is not None:
+                reused[index] = previous
+            else:
+                pending.append(index)
+
+    # Parents are not needed to evaluate the pending parts on their own
+    pending_nodes = [nodes[index] for index in pending]
+    pending_masses = None if masses is None else [masses[index] for index in pending]
+    canonical = dedupe_bom(pending_nodes, pending_masses)
+    scheduled = [
+        submit_part_evaluations(
+            pending_nodes,
+            canonical,
+            jurisdiction,
+            executor,
+            token_budget,
+            SubstanceResolver(JurisdictionIndex(jurisdiction.substance_tolerances)),
+            masses=pending_masses,
+        )
+        for jurisdiction in jurisdictions
+    ]
+
+    results: list[JurisdictionPartComplianceResult] = []
+    for jurisdiction, flat, futures in zip(jurisdictions, previous_flat, scheduled):
+        evaluations: list[Tuple[list[Violation], list[CompliantSubstance]] | None] = [
+            None
+        ] * len(nodes)
+        for index, previous in reused.items():
+            evaluations[index] = (
+                flat[previous].violations,
+                flat[previous].compliant_substances,
+            )
+        for index, future in zip(pending, futures):
+            evaluations[index] = future.result()
+        results.append(
+            build_result_tree(
+                nodes,
+                jurisdiction,
+                evaluations,
+                {index: flat[previous] for index, previous in spliced.items()},
+            )
+        )
+
+    evaluated = sum(1 for index, first in enumerate(canonical) if first == index)
+    return results, {
+        "parts": len(nodes),
+        "spliced": len(spliced) + sum(below_spliced),
+        "rebuilt": len(reused) + len(pending),
+        "evaluations": evaluated * len(jurisdictions),
+    }
+
+
+def cached_mappings(
+    part: Part, jurisidiction: Jurisdiction
+) -> list[SubstanceMapping] | None:
+    """
+    The cached LLM mappings of a part's substances, requested with either the
+    single part or the batched prompt, None if neither is cached.
+    """
+
+    for prompt in (
+        JURISDICTION_PART_SUBSTANCE_MAPPING,
+        JURISDICTION_BATCH_PART_SUBSTANCE_MAPPING,
+    ):
+        cached = mapping_cache.get(mapping_cache_key(part, jurisidiction, prompt))
+        if cached is not None:
+            return SubstanceMappingList.model_validate_json(cached).mappings
+    return None
+
+
+def map_to_added(
+    substance: Substance, jurisdiction: Jurisdiction, added: list[Substance]
+) -> SubstanceMapping:
+    """
+    Map a part substance that no jurisdiction substance applied to against the
+    `added` substances of the jurisdiction only. The mapping does not depend
+    on the amount, so the substance is sent without its value and parts that
+    list the same substance share one cached request.
+    """
+
+    probe = Part(
+        id="", name="", substances=[substance.model_copy(update={"value": None})]
+    )
+    for mapping in get_substance_mappings(
+        probe, jurisdiction.model_copy(update={"substance_tolerances": added})
+    ):
+        if mapping.part_substance.name == substance.name:
+            return mapping.model_copy(update={"part_substance": substance})
+    return SubstanceMapping(
+        part_substance=substance, jurisidiction_substance=None, is_comparable=False
+    )
+
+
+def revise_part_mappings(
+    part: Part,
+    previous: Jurisdiction,
+    previous_resolver: SubstanceResolver,
+    jurisdiction: Jurisdiction,
+    resolver: SubstanceResolver,
+    delta: ToleranceDelta,
+) -> list[SubstanceMapping] | None:
+    """
+    Update the substance mappings of a single part (ignoring its BOM) from the
+    `previous` version of a jurisdiction to the current one, whose resolvers
+    are given, with as few LLM requests as possible.
+
+    Substances are mapped locally as in `map_part`. Substances left to the LLM
+    keep their previous mapping, read from the mapping cache. Only those that
+    pointed to no regulation, or to a substance that was removed, are mapped
+    again, against the added substances (see `map_to_added`). Leftovers
+    without a cached mapping are mapped in full.
+
+    Returns:
+        list[SubstanceMapping] | None: The mappings of the part, or None if its
+        evaluation cannot differ from the previous one.
+    """
+
+    if not part.substances:
+        return None
+    previous_local, previous_leftovers = previous_resolver.resolve(part.substances)
+    local, leftovers = resolver.resolve(part.substances)
+    affected = local != previous_local
+
+    # Previous mappings by part substance name, in order, as in `merge_mappings`
+    previous_mappings: dict[str, list[SubstanceMapping]] = {}
+    if previous_leftovers:
+        for mapping in (
+            cached_mappings(
+                part.model_copy(update={"substances": previous_leftovers}), previous
+            )
+            or []
+        ):
+            previous_mappings.setdefault(mapping.part_substance.name, []).append(
+                mapping
+            )
+
+    llm_mappings: list[SubstanceMapping] = []
+    unmapped: list[Substance] = []
+    for substance in leftovers:
+        if not previous_mappings.get(substance.name):
+            unmapped.append(substance)
+            continue
+        mapping = previous_mappings[substance.name].pop(0)
+        target = mapping.jurisidiction_substance
+        current = None if target is None else resolver.index.find(target)
+        if target is not None and current is None:
+            # The substance it pointed to was removed
+            affected = True
+            mapping = SubstanceMapping(
+                part_substance=substance,
+                jurisidiction_substance=None,
+                is_comparable=False,
+            )
+        elif target is not None:
+            # Compare the entries `check_compliance` would use for the target
+            affected |= (previous_resolver.index.find(target) or target) != current
+        if current is None and delta.added:
+            affected = True
+            mapping = map_to_added(substance, jurisdiction, delta.added)
+        llm_mappings.append(mapping)
+    if unmapped:
+        affected = True
+        llm_mappings += get_substance_mappings(
+            part.model_copy(update={"substances": unmapped}), jurisdiction
+        )
+
+    if not affected:
+        return None
+    return merge_mappings(part.substances, local, llm_mappings)
+
+
+def recheck_part(
+    part: Part,
+    jurisdiction: Jurisdiction,
+    resolver: SubstanceResolver,
+    part_mass: float | None = None,
+    previous: Jurisdiction | None = None,
+    previous_resolver: SubstanceResolver | None = None,
+    delta: ToleranceDelta | None = None,
+) -> Tuple[list[Violation], list[CompliantSubstance]] | None:
+    """
+    Evaluate a part again (see `evaluate_part`) with the mappings revised from
+    the `previous` version of the jurisdiction (see `revise_part_mappings`),
+    or in full without a previous version. Returns None for a part whose
+    evaluation is not affected by the change.
+    """
+
+    if previous is None:
+        return evaluate_part(part, jurisdiction, resolver, part_mass)
+    mappings = revise_part_mappings(
+        part, previous, previous_resolver, jurisdiction, resolver, delta
+    )
+    if mappings is None:
+        return None
+    return check_compliance(mappings, resolver.index, part_mass)
+
+
+class CheckedBOM(NamedTuple):
+    """
+    A flattened BOM with the jurisdictions it was checked against and the result
+    tree of each of them, as stored by a previous check.
+    """
+
+    nodes: list[BOMNode]
+    jurisdictions: list[Jurisdiction]
+    results: list[JurisdictionPartComplianceResult]
+    # The node masses the BOM was checked with, see `parallel_compliance_check`
+    masses: list[float | None] | None = None
+
+
+def revise_regulation_check(
+    portfolio: list[CheckedBOM],
+    jurisdictions: list[Jurisdiction],
+    executor: Executor,
+) -> Tuple[list[list[JurisdictionPartComplianceResult]], dict[str, int]]:
+    """
+    Re-check a portfolio of previously checked BOMs against new versions of
+    their jurisdictions, matched by name.
+
+    For every jurisdiction only the parts whose evaluation is affected by its
+    `tolerance_delta` (see `recheck_part`) are evaluated again, the others keep
+    their previous evaluation and subtrees without affected parts are spliced
+    in from the previous result tree. Rechecks are shared by identical parts
+    across the whole portfolio and run on the executor. A jurisdiction a BOM
+    was not checked against before is checked in full.
+
+    Args:
+        portfolio (list[CheckedBOM]): The previously checked BOMs.
+        jurisdictions (list[Jurisdiction]): The new jurisdictions.
+        executor (Executor): Shared executor bounding the LLM calls in flight.
+
+    Returns:
+        Tuple[list[list[JurisdictionPartComplianceResult]], dict[str, int]]: For
+        every BOM one result tree per jurisdiction, in the same order as
+        `jurisdictions`, and the number of result trees, unchanged trees,
+        re-evaluated parts and evaluations.
+
+    Raises:
+        ValueError: If previous results do not match their BOM.
+    """
+
+    resolvers = [
+        SubstanceResolver(JurisdictionIndex(jurisdiction.substance_tolerances))
+        for jurisdiction in jurisdictions
+    ]
+    # Shared by the portfolio: resolvers of the previous jurisdiction versions
+    # and the submitted rechecks
+    previous_resolvers: dict[str, SubstanceResolver] = {}
+    submitted: dict[tuple[int, str | None, str], Future] = {}
+    stats = {"results": 0, "unchanged": 0, "parts": 0, "evaluations": 0}
+
+    # The rechecks by node and the previous result of every (BOM, jurisdiction)
+    plans: list[
+        list[tuple[dict[int, Future], JurisdictionPartComplianceResult | None]]
+    ] = []
+    for checked in portfolio:
+        previous_by_name = {
+            previous.name: (previous, result)
+            for previous, result in zip(checked.jurisdictions, checked.results)
+        }
+        bom_plans = []
+        for position, (jurisdiction, resolver) in enumerate(
+            zip(jurisdictions, resolvers)
+        ):
+            stats["results"] += 1
+            previous, previous_result = previous_by_name.get(
+                jurisdiction.name, (None, None)
+            )
+            previous_key = previous_resolver = delta = None
+            if previous is not None:
+                delta = tolerance_delta(previous, jurisdiction)
+                if not delta:
+                    stats["unchanged"] += 1
+                    bom_plans.append(({}, previous_result))
+                    continue
+                previous_key = make_key(previous.model_dump_json())
+                if previous_key not in previous_resolvers:
+                    previous_resolvers[previous_key] = SubstanceResolver(
+                        JurisdictionIndex(previous.substance_tolerances)
+                    )
+                previous_resolver = previous_resolvers[previous_key]
+
+            rechecks: dict[int, Future] = {}
+            for index, node in enumerate(checked.nodes):
+                part_mass = None if checked.masses is None else checked.masses[index]
+                key = (position, previous_key, dedupe_key(node.part, part_mass))
+                if key not in submitted:
+                    submitted[key] = executor.submit(
+                        recheck_part,
+                        node.part,
+                        jurisdiction,
+                        resolver,
+                        part_mass,
+                        previous,
+                        previous_resolver,
+                        delta,
+                    )
+                rechecks[index] = submitted[key]
+            bom_plans.append((rechecks, previous_result))
+        plans.append(bom_plans)
+
+    results: list[list[JurisdictionPartComplianceResult]] = []
+    for checked, bom_plans in zip(portfolio, plans):
+        nodes = checked.nodes
+        bom_results = []
+        for jurisdiction, (rechecks, previous_result) in zip(jurisdictions, bom_plans):
+            # Unaffected parts have no new evaluation
+            evaluated = {
+                index: evaluation
+                for index, future in rechecks.items()
+                if (evaluation := future.result()) is not None
+            }
+            stats["parts"] += len(evaluated)
+            if previous_result is not None and not evaluated:
+                # Nothing affected, the previous tree is still valid
+                bom_results.append(previous_result)
+                continue
+            previous_flat = []
+            if previous_result is not None:
+                previous_flat = flatten_results(previous_result)
+                if [result.part_id for result in previous_flat] != [
+                    node.part.id for node in nodes
+                ]:
+                    raise ValueError("The previous results do not match the BOM")
+            # Subtrees without a new evaluation are spliced in from the previous tree
+            changed = [index in evaluated for index in range(len(nodes))]
+            for index in reversed(range(1, len(nodes))):
+                if changed[index]:
+                    changed[nodes[index].parent] = True
+            evaluations: list[
+                Tuple[list[Violation], list[CompliantSubstance]] | None
+            ] = [None] * len(nodes)
+            spliced: dict[int, JurisdictionPartComplianceResult] = {}
+            for index, node in enumerate(nodes):
+                if index in evaluated:
+                    evaluations[index] = evaluated[index]
+                elif changed[index]:
+                    evaluations[index] = (
+                        previous_flat[index].violations,
+                        previous_flat[index].compliant_substances,
+                    )
+                elif node.parent < 0 or changed[node.parent]:
+                    spliced[index] = previous_flat[index]
+            bom_results.append(
+                build_result_tree(nodes, jurisdiction, evaluations, spliced)
+            )
+        results.append(bom_results)
+
+    stats["evaluations"] = sum(
+        1 for future in submitted.values() if future.result() is not None
+    )
+    return results, stats
@@ -88,6 +88,49 @@ Return a JSON object following this schema:
 - Do not change or normalize values or units — output exactly as given.
 """
 
+# Batched variant of JURISDICTION_PART_SUBSTANCE_MAPPING
+# Maps the substances of several parts in one request, the response is split back out by part_id
+JURISDICTION_BATCH_PART_SUBSTANCE_MAPPING = """
+You are a **Substance Mapping Agent**.  
+
+Your role is to align chemical substances from several parts of a Bill of Materials with regulatory substances defined by a jurisdiction.
+You must rely on chemical knowledge, synonyms, trivial/common names, IUPAC names, and elemental symbols to decide the best mappings.
+
+For every mapping you produce, you must also:
+
+- Determine **physical comparability** (`is_comparable`) to indicate whether both substances measure the same physical quantity.
+
+You are given:
+
+1. **Jurisdiction substances** (regulated list):
+{jurisidiction_substances}
+
+2. **Parts**, each with its `part_id` and its substances:
+{parts}
+
+### Your Task:
+
+For **each part independently**:
+1. Identify the best match between substances from the part and substances from the jurisdiction use substance standardized names for this.
+2. Matching should be based on chemical equivalence, synonyms, or element symbols (e.g., "Lead" ↔ "Pb").
+3. If a mapping cannot be found, leave the corresponding field as null.
+4. For **Physical comparibility check (`is_comparable`)**:
+    - Determine if the measured property of the part substance and jurisdiction substance is the same physical quantity (e.g., both represent mass, volume, concentration, etc.).
+    - For this purpose, all units of concentration (e.g., percentage(%), mass/mass, volume/volume, or parts-per-notation like ppm, ppb, ppt) should be considered the same physical quantity.
+    - If they represent different physical quantities (e.g., mass vs concentration), set `is_comparable = False`.
+    - If they represent the same physical quantity, set `is_comparable = True`.
+
+### Output:
+Return a JSON object following this schema:
+{format_instructions}
+
+### Notes:
+- Return exactly one entry per part, using the `part_id` exactly as given.
+- Include all the substances of every part, if the corresponding mapping is not set the jurisdiction_substance to null.
+- Do not include those jurisdiction susbtances for which there are no corresponding part substance.
+- Do not change or normalize values or units — output exactly as given.
+"""
+
 # NOTE: Work In Progess
 UNIT_CONVERSION = """
 You are an expert **Unit Converter**, an assistant that converts between units and values of the substances with precise stoichiometric reasoning.
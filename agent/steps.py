@@ -1,55 +1,220 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterator
+
+import fitz
 from langchain_community.document_loaders import PyMuPDFLoader
+from langchain_core.documents import Document
+
+from agent.models import (
+    ComplianceCheckAgentState,
+    ComplianceFlip,
+    Jurisdictions,
+    PageSummary,
+)
+from agent.operations import (
+    CheckedBOM,
+    document_cache,
+    dedupe_bom,
+    document_cache_key,
+    extract_jurisdiction,
+    flatten_bom,
+    flatten_results,
+    mapping_cache,
+    page_cache,
+    parallel_compliance_check,
+    revise_compliance_check,
+    revise_regulation_check,
+)
+from agent.utils.annex_parser import MIN_CONFIDENCE, parse_annex
+from agent.utils.cache import hash_file
+from agent.utils.chunking import chunk_pages
+from agent.utils.jurisdiction_index import JurisdictionIndex
+from agent.utils.ndjson import NDJSONWriter
+from agent.utils.page_filter import is_candidate
+from agent.utils.part_mass import bom_masses, part_masses
+from agent.utils.run_counters import ContextExecutor, collect
+from schema import ComplianceReport, Jurisdiction, Part
 
-from agent.models import ComplianceCheckAgentState
-from agent.operations import dfs_part_traversal, extract_jurisdiction
-from schema import ComplianceReport, Jurisdiction
+
+def lookup_jurisdictions(
+    state: ComplianceCheckAgentState,
+) -> ComplianceCheckAgentState:
+    print("▶️ Starting: lookup_jurisdictions")
+    state.document_hash = hash_file(state.file_path)
+    cached = document_cache.get(
+        document_cache_key(
+            state.document_hash,
+            state.filter_pages,
+            state.parse_annex_tables,
+            state.extraction_token_budget,
+        )
+    )
+    if cached is not None:
+        state.jurisdictions = Jurisdictions.model_validate_json(cached).jurisdictions
+    state.run_stats["document_cache"] = {
+        "hits": int(cached is not None),
+        "misses": int(cached is None),
+    }
+    print(f"Document cache: {state.run_stats['document_cache']}")
+    print("✅ Completed: lookup_jurisdictions")
+    return state
+
+
+def route_after_lookup(state: ComplianceCheckAgentState) -> str:
+    # Skip parsing and extraction when the document was already analysed
+    if state.run_stats["document_cache"]["hits"]:
+        return "check_part_compliance"
+    return "parse_pdf"
 
 
 def parse_pdf(state: ComplianceCheckAgentState) -> ComplianceCheckAgentState:
     print("▶️ Starting: parse_pdf")
-    loader = PyMuPDFLoader(state.file_path)
-    docs = loader.load()
-    state.pages = docs
+    # Only open the document, get_jurisdictions streams the pages into extraction
+    with fitz.open(state.file_path) as document:
+        state.run_stats["parse_pdf"] = {"pages": document.page_count}
+    print(f"PDF pages: {state.run_stats['parse_pdf']['pages']}")
     print("✅ Completed: parse_pdf")
     return state
 
 
+def iter_pages(state: ComplianceCheckAgentState) -> Iterator[Document]:
+    """
+    Yield every regulation page, from `state.pages` if they were already
+    loaded, otherwise lazily parsed from the PDF one page at a time.
+    """
+    if state.pages:
+        yield from state.pages
+    else:
+        yield from PyMuPDFLoader(state.file_path).lazy_load()
+
+
 def get_jurisdictions(state: ComplianceCheckAgentState) -> ComplianceCheckAgentState:
     print("▶️ Starting: get_jurisdictions")
     jurisdictions_map: dict[str, Jurisdiction] = {}
-    page_jurisdictions: list[Jurisdiction] = []
-    for page in state.pages:
-        page_jurisdictions = extract_jurisdiction(page.page_content)
-        for j in page_jurisdictions:
-            # Deduplicate substances in this jurisdiction before processing
-            if j.substance_tolerances:
-                j.substance_tolerances = list(
-                    {s.name: s for s in j.substance_tolerances}.values()
-                )
+    digest = hashlib.sha256()
+    # Producer/consumer pipeline: pages are parsed one at a time and submitted
+    # right away, so the first LLM call starts while later pages are still being
+    # parsed. The semaphore bounds the pages waiting in memory for a worker.
+    in_flight = threading.BoundedSemaphore(2 * state.max_concurrency)
+    lock = threading.Lock()
+    start = time.perf_counter()
+    time_to_first_jurisdiction: float | None = None
+
+    def on_result(jurisdictions: list[Jurisdiction]):
+        nonlocal time_to_first_jurisdiction
+        if jurisdictions:
+            with lock:
+                if time_to_first_jurisdiction is None:
+                    time_to_first_jurisdiction = time.perf_counter() - start
 
+    def on_extracted(future: Future):
+        in_flight.release()
+        if future.exception() is None:
+            on_result(future.result())
+
+    loaded: list[Document] = []
+    page_count = skipped = 0
+
+    def page_texts() -> Iterator[str]:
+        nonlocal page_count, skipped
+        for page in iter_pages(state):
+            page_count += 1
+            digest.update(hashlib.sha256(page.page_content.encode("utf-8")).digest())
+            if not state.lean_state:
+                loaded.append(page)
+            if state.filter_pages and not is_candidate(page.page_content):
+                # Nothing regulatory on the page, skip the LLM call
+                skipped += 1
+                continue
+            yield page.page_content
+
+    prompts = page_texts()
+    if state.extraction_token_budget is not None:
+        prompts = chunk_pages(prompts, state.extraction_token_budget)
+
+    futures: list[Future] = []
+    parsed = 0
+    # Cache hits and misses are counted for this run only, other runs may share
+    # the caches concurrently
+    with collect() as counters, ContextExecutor(
+        max_workers=state.max_concurrency
+    ) as executor:
+        for text in prompts:
+            if state.parse_annex_tables:
+                annex = parse_annex(text)
+                if annex.confidence >= MIN_CONFIDENCE:
+                    # Limits fully parsed locally, no LLM call needed
+                    future = Future()
+                    future.set_result(annex.jurisdictions)
+                    on_result(annex.jurisdictions)
+                    futures.append(future)
+                    parsed += 1
+                    continue
+            in_flight.acquire()
+            future = executor.submit(extract_jurisdiction, text)
+            future.add_done_callback(on_extracted)
+            futures.append(future)
+        # Results are merged in page order so the merge below stays deterministic
+        page_results = [future.result() for future in futures]
+    cache_stats = counters.get(page_cache.namespace, "hits", "misses")
+    state.pages = loaded
+    state.page_summary = PageSummary(
+        page_count=page_count, text_hash=digest.hexdigest()
+    )
+    state.run_stats["page_extraction"] = {
+        "pages": page_count,
+        "prompts": len(page_results),
+        "reused": cache_stats["hits"],
+        "extracted": cache_stats["misses"],
+    }
+    if time_to_first_jurisdiction is not None:
+        state.run_stats["page_extraction"]["time_to_first_jurisdiction"] = round(
+            time_to_first_jurisdiction, 3
+        )
+    print(f"Page extraction: {state.run_stats['page_extraction']}")
+    if state.filter_pages:
+        state.run_stats["page_filter"] = {
+            "pages": page_count,
+            "skipped": skipped,
+            "skip_rate": round(skipped / page_count, 3) if page_count else 0,
+        }
+        print(f"Page filter: {state.run_stats['page_filter']}")
+    if state.parse_annex_tables:
+        state.run_stats["annex_parser"] = {
+            "prompts": len(page_results),
+            "parsed": parsed,
+            "sent_to_llm": len(page_results) - parsed,
+        }
+        print(f"Annex parser: {state.run_stats['annex_parser']}")
+
+    # Merge jurisdictions by name and their substances by casefolded name,
+    # later pages override the tolerances of earlier ones
+    indexes: dict[str, JurisdictionIndex] = {}
+    for page_jurisdictions in page_results:
+        for j in page_jurisdictions:
             if j.name not in jurisdictions_map:
                 jurisdictions_map[j.name] = j
-            else:
-                existing = jurisdictions_map[j.name]
-                if len(existing.substance_tolerances) == 0:
-                    existing.substance_tolerances = j.substance_tolerances
-                else:
-                    # Merge based on name only
-                    merged_substances = {
-                        s.name: s for s in existing.substance_tolerances
-                    }
-                    for s in j.substance_tolerances:
-                        merged_substances[s.name] = s
-                    existing.substance_tolerances = list(merged_substances.values())
-
-    # Final pass: ensure substances in each jurisdiction are deduplicated by name
-    for jur in jurisdictions_map.values():
-        if jur.substance_tolerances:
-            jur.substance_tolerances = list(
-                {s.name.casefold(): s for s in jur.substance_tolerances}.values()
-            )
+                indexes[j.name] = JurisdictionIndex()
+            for substance in j.substance_tolerances:
+                indexes[j.name].upsert(substance)
+
+    for name, jur in jurisdictions_map.items():
+        jur.substance_tolerances = indexes[name].substances
 
     state.jurisdictions = list(jurisdictions_map.values())
+    if state.document_hash:
+        document_cache.set(
+            document_cache_key(
+                state.document_hash,
+                state.filter_pages,
+                state.parse_annex_tables,
+                state.extraction_token_budget,
+            ),
+            Jurisdictions(jurisdictions=state.jurisdictions).model_dump_json(),
+        )
     print("✅ Completed: get_jurisdictions")
     print(state.jurisdictions)
 
@@ -60,17 +225,234 @@ def check_part_compliance(
     state: ComplianceCheckAgentState,
 ) -> ComplianceCheckAgentState:
     print("▶️ Starting: check_part_compliance")
-    for jurisdiction in state.jurisdictions:
-        jurisdiction_part_compliance_result = dfs_part_traversal(
-            state.part, jurisdiction
-        )
-        state.jurisdiction_compliance_results.append(
-            jurisdiction_part_compliance_result
+    nodes = flatten_bom(state.part)
+    masses = None
+    if state.mass_fractions:
+        masses = part_masses([node.part for node in nodes])
+        totals = bom_masses(
+            [node.part for node in nodes], [node.parent for node in nodes]
         )
+        state.run_stats["part_mass"] = {
+            "parts": len(nodes),
+            "known": sum(1 for mass in masses if mass is not None),
+            "known_with_bom": sum(1 for mass in totals if mass is not None),
+        }
+        if totals and totals[0] is not None:
+            state.run_stats["part_mass"]["total_kg"] = totals[0]
+        print(f"Part mass: {state.run_stats['part_mass']}")
+    # With NDJSON output the records are only streamed, no result tree is kept
+    writer = NDJSONWriter(state.ndjson_path) if state.ndjson_path else None
+    # All jurisdictions share one executor, so max_concurrency is a global budget.
+    # Cache hits and local resolutions are counted for this run only.
+    try:
+        with collect() as counters, ContextExecutor(
+            max_workers=state.max_concurrency
+        ) as executor:
+            state.jurisdiction_compliance_results.extend(
+                parallel_compliance_check(
+                    nodes,
+                    state.jurisdictions,
+                    executor,
+                    state.mapping_token_budget,
+                    writer.write if writer else None,
+                    state.vectorized_compliance,
+                    masses,
+                    build_trees=writer is None,
+                )
+            )
+    finally:
+        if writer is not None:
+            writer.close()
+            state.run_stats["ndjson_output"] = {"records": writer.count}
+            print(f"NDJSON output: {writer.count} records written to {writer.path}")
+
+    # Only parts with substances need an evaluation (and an LLM call)
+    canonical = dedupe_bom(nodes, masses)
+    with_substances = [i for i, node in enumerate(nodes) if node.part.substances]
+    evaluated = sum(1 for i in with_substances if canonical[i] == i)
+    state.run_stats["bom_dedup"] = {
+        "parts": len(nodes),
+        "evaluations": evaluated * len(state.jurisdictions),
+        "duplicate_evaluations_avoided": (len(with_substances) - evaluated)
+        * len(state.jurisdictions),
+    }
+    print(f"BOM deduplication: {state.run_stats['bom_dedup']}")
+    state.run_stats["substance_mapping_cache"] = counters.get(
+        mapping_cache.namespace, "hits", "misses"
+    )
+    print(f"Substance mapping cache: {state.run_stats['substance_mapping_cache']}")
+    state.run_stats["local_substance_resolution"] = counters.get(
+        "substance_resolution", "resolved", "sent_to_llm"
+    )
+    print(
+        f"Local substance resolution: {state.run_stats['local_substance_resolution']}"
+    )
     print("✅ Completed: check_part_compliance")
     return state
 
 
+def recheck_revision(
+    previous: ComplianceCheckAgentState | ComplianceReport,
+    part: Part,
+    previous_part: Part | None = None,
+) -> ComplianceCheckAgentState:
+    """
+    Check a revision of a part that was already checked, without running the
+    whole workflow again: the jurisdictions of the previous check are reused
+    and only the changed sub-assemblies and their ancestors are rebuilt (see
+    `revise_compliance_check`).
+
+    Args:
+        previous (ComplianceCheckAgentState | ComplianceReport): The state or
+            report of the previous check.
+        part (Part): The revised part.
+        previous_part (Part | None): The part that was checked, required with a
+            report since reports do not include it.
+
+    Returns:
+        ComplianceCheckAgentState: A state with the results and report of the
+        revised part, and the settings of the previous state.
+
+    Raises:
+        ValueError: If a report is given without its `previous_part`.
+    """
+
+    print("▶️ Starting: recheck_revision")
+    if isinstance(previous, ComplianceReport):
+        if previous_part is None:
+            raise ValueError("previous_part is required to recheck a report")
+        previous = ComplianceCheckAgentState(
+            report_name=previous.name,
+            part=previous_part,
+            file_path="",
+            jurisdictions=previous.jurisdictions,
+            jurisdiction_compliance_results=previous.jurisdiction_compliance_results,
+        )
+    state = previous.model_copy(
+        update={
+            "part": part,
+            "jurisdiction_compliance_results": [],
+            "compliance_report": None,
+            "run_stats": {},
+        }
+    )
+    previous_nodes = flatten_bom(previous.part)
+    nodes = flatten_bom(part)
+    previous_masses = masses = None
+    if state.mass_fractions:
+        previous_masses = part_masses([node.part for node in previous_nodes])
+        masses = part_masses([node.part for node in nodes])
+    with collect() as counters, ContextExecutor(
+        max_workers=state.max_concurrency
+    ) as executor:
+        results, state.run_stats["bom_revision"] = revise_compliance_check(
+            previous_nodes,
+            previous.jurisdiction_compliance_results,
+            nodes,
+            state.jurisdictions,
+            executor,
+            state.mapping_token_budget,
+            masses,
+            previous_masses,
+        )
+    state.jurisdiction_compliance_results = results
+    print(f"BOM revision: {state.run_stats['bom_revision']}")
+    state.run_stats["substance_mapping_cache"] = counters.get(
+        mapping_cache.namespace, "hits", "misses"
+    )
+    print(f"Substance mapping cache: {state.run_stats['substance_mapping_cache']}")
+    print("✅ Completed: recheck_revision")
+    return build_report(state)
+
+
+def recheck_regulation_change(
+    states: list[ComplianceCheckAgentState],
+    jurisdictions: list[Jurisdiction],
+    max_concurrency: int = 4,
+) -> tuple[list[ComplianceCheckAgentState], list[ComplianceFlip]]:
+    """
+    Re-check a portfolio of finished checks against amended jurisdictions,
+    evaluating again only the parts affected by the change of each
+    jurisdiction's substance tolerances (see `revise_regulation_check`).
+
+    Args:
+        states (list[ComplianceCheckAgentState]): The finished checks.
+        jurisdictions (list[Jurisdiction]): The amended jurisdictions.
+        max_concurrency (int): Maximum number of LLM requests in flight at once.
+
+    Returns:
+        tuple[list[ComplianceCheckAgentState], list[ComplianceFlip]]: A state
+        with the new results and report for each of `states`, and every part
+        (including sub-parts) whose compliance status changed.
+    """
+
+    print("▶️ Starting: recheck_regulation_change")
+    portfolio: list[CheckedBOM] = []
+    for state in states:
+        nodes = flatten_bom(state.part)
+        masses = None
+        if state.mass_fractions:
+            masses = part_masses([node.part for node in nodes])
+        portfolio.append(
+            CheckedBOM(
+                nodes,
+                state.jurisdictions,
+                state.jurisdiction_compliance_results,
+                masses,
+            )
+        )
+    with collect() as counters, ContextExecutor(
+        max_workers=max_concurrency
+    ) as executor:
+        results, stats = revise_regulation_check(portfolio, jurisdictions, executor)
+
+    rechecked: list[ComplianceCheckAgentState] = []
+    flips: list[ComplianceFlip] = []
+    for state, state_results in zip(states, results):
+        previous_results = {
+            result.jurisdiction_name: result
+            for result in state.jurisdiction_compliance_results
+        }
+        for result in state_results:
+            previous = previous_results.get(result.jurisdiction_name)
+            # Unchanged trees are reused as they are
+            if previous is None or previous is result:
+                continue
+            for before, after in zip(
+                flatten_results(previous), flatten_results(result)
+            ):
+                if before.is_compliant != after.is_compliant:
+                    flips.append(
+                        ComplianceFlip(
+                            report_name=state.report_name,
+                            part_id=after.part_id,
+                            part_name=after.part_name,
+                            jurisdiction_name=after.jurisdiction_name,
+                            was_compliant=before.is_compliant,
+                            is_compliant=after.is_compliant,
+                        )
+                    )
+        rechecked.append(
+            build_report(
+                state.model_copy(
+                    update={
+                        "jurisdictions": jurisdictions,
+                        "jurisdiction_compliance_results": state_results,
+                        "compliance_report": None,
+                        "run_stats": {},
+                    }
+                )
+            )
+        )
+
+    stats["flips"] = len(flips)
+    print(f"Regulation recheck: {stats}")
+    mapping_stats = counters.get(mapping_cache.namespace, "hits", "misses")
+    print(f"Substance mapping cache: {mapping_stats}")
+    print("✅ Completed: recheck_regulation_change")
+    return rechecked, flips
+
+
 def build_report(state: ComplianceCheckAgentState):
     print("▶️ Starting: build_report")
     state.compliance_report = ComplianceReport(
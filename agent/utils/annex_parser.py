@@ -0,0 +1,144 @@
+"""
+agent/utils/annex_parser.py
+
+This module parses annex-style substance limit lists, such as the RoHS Annex II
+lines "Lead (0,1 %)" or "Cadmium (0,01 %)", into jurisdictions without the LLM.
+Every parse comes with a confidence score, text it cannot fully account for
+should be left to the LLM extraction.
+"""
+
+import re
+from typing import NamedTuple
+
+from agent.utils.jurisdiction_index import SYNONYM_INDEX, normalize_name
+from agent.utils.page_filter import CONCENTRATION
+from schema import Jurisdiction, Substance
+
+# Parses scoring below this are not trusted, the text goes to the LLM instead
+MIN_CONFIDENCE = 0.9
+
+UNIT = r"%|wt\s*%|ppm|ppb|mg\s*/\s*kg|µg\s*/\s*g|g\s*/\s*kg"
+
+# Names must start upper case in both line formats, a lower case start is
+# usually the continuation of a name wrapped over two lines (left to the LLM)
+
+# "Polybrominated biphenyls (PBB) (0,1 %)"
+PARENTHESIZED_LIMIT = re.compile(
+    r"^(?P<name>[A-Z][^\n]*?)\s*"
+    r"(?:\((?P<abbreviation>[A-Z][A-Za-z0-9]{1,7})\)\s*)?"
+    rf"\(\s*(?P<value>\d+(?:[.,]\d+)?)\s*(?P<unit>{UNIT})\s*\)$",
+)
+
+# Table rows with an explicit separator: "Lead | 0,1 %", "Mercury:  1000 ppm"
+TABLE_ROW_LIMIT = re.compile(
+    r"^(?P<name>[A-Z][\w ,()'-]{0,80}?)"
+    r"(?:\s*\((?P<abbreviation>[A-Z][A-Za-z0-9]{1,7})\))?"
+    r"(?:\s*[|:\t–—]\s*|\s{2,})"
+    rf"(?P<value>\d+(?:[.,]\d+)?)\s*(?P<unit>{UNIT})$",
+)
+
+# Leading list markers, numbering and quotes
+LINE_PREFIX = re.compile(r"^(?:[\s‘’'\"•·\-–—]|\(?\d{1,2}[.)]\s)+")
+
+# Jurisdictions recognized by their name or the references of their legislation
+JURISDICTIONS: list[tuple[str, str, re.Pattern]] = [
+    (
+        "European Union",
+        "EU",
+        re.compile(r"European Union|\bEU\b|\(EC\)|\bEEA\b"),
+    ),
+    ("United Kingdom", "UK", re.compile(r"United Kingdom|Great Britain|\bUK\b")),
+    ("United States", "US", re.compile(r"United States|\bU\.S\.|\bUSA\b")),
+    ("China", "CN", re.compile(r"People's Republic of China|\bPRC\b|\bChina\b")),
+]
+
+MINIMUM_TERMS = re.compile(r"\b(?:minimum|at least|not less than)\b", re.IGNORECASE)
+MAXIMUM_TERMS = re.compile(
+    r"\b(?:maximum|not exceed|tolerated|restricted|at most)\b", re.IGNORECASE
+)
+
+
+class AnnexParseResult(NamedTuple):
+    """
+    Jurisdictions parsed from a text and how much the parse can be trusted:
+    the share of concentration lines parsed, 0 if the jurisdiction is unclear.
+    """
+
+    jurisdictions: list[Jurisdiction]
+    confidence: float
+
+
+def detect_jurisdictions(text: str) -> list[tuple[str, str]]:
+    """Return the (name, abbreviation) of every known jurisdiction the text mentions."""
+    return [
+        (name, abbreviation)
+        for name, abbreviation, pattern in JURISDICTIONS
+        if pattern.search(text)
+    ]
+
+
+def parse_limit(line: str, tolerance_condition: str) -> Substance | None:
+    """Parse a single annex line into a substance limit, or None if it is not one."""
+    line = LINE_PREFIX.sub("", line.strip()).strip()
+    match = PARENTHESIZED_LIMIT.match(line) or TABLE_ROW_LIMIT.match(line)
+    if match is None:
+        return None
+    name = match["name"].strip(" ,:")
+    abbreviation = match["abbreviation"]
+    # Bundled identifier (element symbol or abbreviation) where one is known
+    standardized_name = (
+        SYNONYM_INDEX.get(normalize_name(name))
+        or (abbreviation and SYNONYM_INDEX.get(normalize_name(abbreviation)))
+        or abbreviation
+        or name
+    )
+    return Substance(
+        name=name,
+        standardized_name=standardized_name,
+        value=float(match["value"].replace(",", ".")),
+        unit="".join(match["unit"].split()),
+        tolerance_condition=tolerance_condition,
+    )
+
+
+def parse_annex(text: str) -> AnnexParseResult:
+    """
+    Parse the substance limits listed in `text` for the single jurisdiction it
+    refers to.
+
+    Returns:
+        AnnexParseResult: The parsed jurisdiction (if any limit was found) and
+        the confidence of the parse, between 0 and 1.
+    """
+
+    jurisdictions = detect_jurisdictions(text)
+    tolerance_condition = (
+        "gte"
+        if MINIMUM_TERMS.search(text) and not MAXIMUM_TERMS.search(text)
+        else "lte"
+    )
+
+    substances: list[Substance] = []
+    concentration_lines = 0
+    for line in text.splitlines():
+        if not CONCENTRATION.search(line):
+            continue
+        concentration_lines += 1
+        substance = parse_limit(line, tolerance_condition)
+        if substance is not None:
+            substances.append(substance)
+
+    if not substances or len(jurisdictions) != 1:
+        return AnnexParseResult([], 0.0)
+
+    name, abbreviation = jurisdictions[0]
+    return AnnexParseResult(
+        [
+            Jurisdiction(
+                name=name,
+                abbreviation=abbreviation,
+                substance_tolerances=substances,
+            )
+        ],
+        len(substances) / concentration_lines,
+    )
@@ -0,0 +1,313 @@
+"""
+agent/utils/bom_store.py
+
+This module provides BOMStore, a compact column store for a part and its BOM.
+Parts are rows of id, name and parent index columns, substances are rows of
+interned name, value, unit and condition columns, so a very large assembly is
+held without a pydantic object per part and traversed without recursion.
+"""
+
+import json
+from typing import Any, Iterable, TextIO
+
+import numpy as np
+
+from agent.utils.bom_stream import StreamedPart, iter_parts
+from schema import Part, Substance
+
+# Tolerance conditions by their code in the condition column, -1 means None
+CONDITIONS = ["gte", "lte", "eq"]
+
+
+class BOMStore:
+    """
+    A part and its BOM flattened into columns.
+
+    Parts are stored in pre-order like `flatten_bom` (parents before their
+    children, siblings in BOM order), the root is part 0 and has parent -1.
+    The substances of part i are the substance rows
+    `substance_offsets[i]:substance_offsets[i + 1]`. Strings (part names,
+    substance names and units) are interned in `strings` and referred to by
+    index, missing values are NaN and missing units or conditions are -1.
+    `has_bom` tells whether a part's JSON had a "bom" list, so a part with an
+    empty list is written back as one rather than as a missing BOM.
+    """
+
+    def __init__(self):
+        self.part_ids: list[str] = []
+        self.part_names: list[int] = []
+        self.parents = np.empty(0, dtype=np.int32)
+        self.has_bom = np.empty(0, dtype=np.bool_)
+        self.substance_offsets = np.zeros(1, dtype=np.int64)
+        self.substance_names = np.empty(0, dtype=np.int32)
+        self.standardized_names = np.empty(0, dtype=np.int32)
+        self.values = np.empty(0, dtype=np.float64)
+        self.units = np.empty(0, dtype=np.int32)
+        self.conditions = np.empty(0, dtype=np.int8)
+        self.strings: list[str] = []
+        self._interned: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.part_ids)
+
+    def _intern(self, text: str) -> int:
+        index = self._interned.get(text)
+        if index is None:
+            index = self._interned[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "BOMStore":
+        """Load a store from the JSON of a `Part`, e.g. a data/parts/*.json file."""
+        return cls.from_dict(json.loads(data))
+
+    @classmethod
+    def from_file(cls, path: str) -> "BOMStore":
+        """
+        Load a store from a part JSON file incrementally (see `iter_parts`),
+        without holding the file or its parsed objects in memory.
+        """
+        with open(path, "rb") as f:
+            return cls.from_parts(iter_parts(f))
+
+    @classmethod
+    def from_parts(cls, streamed: Iterable[StreamedPart]) -> "BOMStore":
+        """
+        Build a store from the parts of a BOM in any order, placing each one at
+        its `StreamedPart.index`. Only the columns are kept, not the parts.
+        """
+
+        store = cls()
+        intern = store._intern
+        indices: list[int] = []
+        parents: list[int] = []
+        has_bom: list[bool] = []
+        part_ids: list[str] = []
+        part_names: list[int] = []
+        starts: list[int] = []
+        lengths: list[int] = []
+        names: list[int] = []
+        standardized_names: list[int] = []
+        values: list[float] = []
+        units: list[int] = []
+        conditions: list[int] = []
+
+        for index, parent, part, part_has_bom in streamed:
+            indices.append(index)
+            parents.append(parent)
+            has_bom.append(part_has_bom)
+            part_ids.append(part.id)
+            part_names.append(intern(part.name))
+            starts.append(len(names))
+            lengths.append(len(part.substances))
+            for substance in part.substances:
+                names.append(intern(substance.name))
+                standardized_names.append(intern(substance.standardized_name))
+                values.append(np.nan if substance.value is None else substance.value)
+                units.append(-1 if substance.unit is None else intern(substance.unit))
+                conditions.append(
+                    -1
+                    if substance.tolerance_condition is None
+                    else CONDITIONS.index(substance.tolerance_condition)
+                )
+
+        # Reorder parts by index and their substance rows with them
+        order = np.argsort(np.array(indices, dtype=np.int64), kind="stable")
+        if not np.array_equal(np.array(indices)[order], np.arange(len(indices))):
+            raise ValueError("Streamed part indices are not a complete BOM")
+        ordered_lengths = np.array(lengths, dtype=np.int64)[order]
+        offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        np.cumsum(ordered_lengths, out=offsets[1:])
+        rows = np.repeat(
+            np.array(starts, dtype=np.int64)[order] - offsets[:-1], ordered_lengths
+        ) + np.arange(offsets[-1])
+
+        store.part_ids = [part_ids[index] for index in order.tolist()]
+        store.part_names = [part_names[index] for index in order.tolist()]
+        store.parents = np.array(parents, dtype=np.int32)[order]
+        store.has_bom = np.array(has_bom, dtype=np.bool_)[order]
+        store.substance_offsets = offsets
+        store.substance_names = np.array(names, dtype=np.int32)[rows]
+        store.standardized_names = np.array(standardized_names, dtype=np.int32)[rows]
+        store.values = np.array(values, dtype=np.float64)[rows]
+        store.units = np.array(units, dtype=np.int32)[rows]
+        store.conditions = np.array(conditions, dtype=np.int8)[rows]
+        return store
+
+    @classmethod
+    def from_dict(cls, root: dict[str, Any]) -> "BOMStore":
+        """
+        Load a store from a parsed part JSON object, iteratively.
+
+        Raises:
+            ValueError: If a part or substance misses a required field or a
+                field has the wrong type, as `Part.model_validate` would.
+        """
+
+        store = cls()
+        intern = store._intern
+        parents: list[int] = []
+        has_bom: list[bool] = []
+        offsets: list[int] = [0]
+        names: list[int] = []
+        standardized_names: list[int] = []
+        values: list[float] = []
+        units: list[int] = []
+        conditions: list[int] = []
+
+        stack: list[tuple[Any, int, str]] = [(root, -1, "part")]
+        while stack:
+            part, parent, location = stack.pop()
+            index = len(parents)
+            store.part_ids.append(_field(part, "id", str, location))
+            store.part_names.append(intern(_field(part, "name", str, location)))
+            parents.append(parent)
+
+            substances = _field(part, "substances", list, location, [])
+            for position, substance in enumerate(substances):
+                at = f"{location}.substances.{position}"
+                names.append(intern(_field(substance, "name", str, at)))
+                standardized_names.append(
+                    intern(_field(substance, "standardized_name", str, at))
+                )
+                value = _field(substance, "value", (int, float, type(None)), at)
+                values.append(np.nan if value is None else float(value))
+                unit = _field(substance, "unit", (str, type(None)), at)
+                units.append(-1 if unit is None else intern(unit))
+                condition = _field(
+                    substance, "tolerance_condition", (str, type(None)), at, None
+                )
+                if condition is not None and condition not in CONDITIONS:
+                    raise ValueError(
+                        f"{at}.tolerance_condition: expected one of {CONDITIONS}"
+                    )
+                conditions.append(
+                    -1 if condition is None else CONDITIONS.index(condition)
+                )
+            offsets.append(len(names))
+
+            bom = _field(part, "bom", (list, type(None)), location, None)
+            has_bom.append(bom is not None)
+            # Push children reversed so they are popped in BOM order
+            for position in reversed(range(len(bom or []))):
+                stack.append((bom[position], index, f"{location}.bom.{position}"))
+
+        store.parents = np.array(parents, dtype=np.int32)
+        store.has_bom = np.array(has_bom, dtype=np.bool_)
+        store.substance_offsets = np.array(offsets, dtype=np.int64)
+        store.substance_names = np.array(names, dtype=np.int32)
+        store.standardized_names = np.array(standardized_names, dtype=np.int32)
+        store.values = np.array(values, dtype=np.float64)
+        store.units = np.array(units, dtype=np.int32)
+        store.conditions = np.array(conditions, dtype=np.int8)
+        return store
+
+    def substances(self, index: int) -> list[Substance]:
+        """Build the `Substance` objects of a part."""
+        start, end = self.substance_offsets[index : index + 2].tolist()
+        strings = self.strings
+        return [
+            Substance(
+                name=strings[name],
+                standardized_name=strings[standardized_name],
+                value=None if value != value else value,
+                unit=None if unit < 0 else strings[unit],
+                tolerance_condition=None if condition < 0 else CONDITIONS[condition],
+            )
+            for name, standardized_name, value, unit, condition in zip(
+                self.substance_names[start:end].tolist(),
+                self.standardized_names[start:end].tolist(),
+                self.values[start:end].tolist(),
+                self.units[start:end].tolist(),
+                self.conditions[start:end].tolist(),
+            )
+        ]
+
+    def substance_key(self, index: int) -> bytes:
+        """
+        The substance rows of a part as bytes, equal for parts of this store
+        with the same substances in the same order.
+        """
+        start, end = self.substance_offsets[index : index + 2].tolist()
+        return b"".join(
+            column[start:end].tobytes()
+            for column in (
+                self.substance_names,
+                self.standardized_names,
+                self.values,
+                self.units,
+                self.conditions,
+            )
+        )
+
+    def part(self, index: int) -> Part:
+        """Build a part with its substances but without its BOM."""
+        return Part(
+            id=self.part_ids[index],
+            name=self.strings[self.part_names[index]],
+            substances=self.substances(index),
+        )
+
+    def write_json(self, file: TextIO) -> None:
+        """
+        Write the JSON of the nested `Part`, the same as `Part.model_dump_json`
+        up to formatting, iteratively and without building the nested part.
+        """
+
+        parents = self.parents.tolist()
+        children: list[list[int]] = [[] for _ in range(len(self))]
+        for child, parent in enumerate(parents):
+            if parent >= 0:
+                children[parent].append(child)
+
+        def head(index: int) -> str:
+            fields = {
+                "id": self.part_ids[index],
+                "name": self.strings[self.part_names[index]],
+            }
+            return json.dumps(fields, ensure_ascii=False)[:-1] + ', "bom": '
+
+        def tail(index: int) -> str:
+            substances = [
+                substance.model_dump(mode="json")
+                for substance in self.substances(index)
+            ]
+            return f', "substances": {json.dumps(substances, ensure_ascii=False)}}}'
+
+        # (index, closing) pairs, a part is opened first and closed after its BOM
+        stack: list[tuple[int, bool]] = [(0, False)] if len(self) else []
+        while stack:
+            index, closing = stack.pop()
+            if closing:
+                file.write("]" + tail(index))
+                continue
+            if index and index != children[parents[index]][0]:
+                file.write(", ")
+            file.write(head(index))
+            if children[index]:
+                file.write("[")
+                stack.append((index, True))
+                stack.extend((child, False) for child in reversed(children[index]))
+            else:
+                file.write(("[]" if self.has_bom[index] else "null") + tail(index))
+
+
+def _field(
+    obj: Any,
+    key: str,
+    types: type | tuple[type, ...],
+    location: str,
+    *default: Any,
+) -> Any:
+    """Read a field of a JSON object, with a default if one is given."""
+    if not isinstance(obj, dict):
+        raise ValueError(f"{location}: expected an object")
+    if key not in obj:
+        if default:
+            return default[0]
+        raise ValueError(f"{location}.{key}: field required")
+    value = obj[key]
+    if not isinstance(value, types) or isinstance(value, bool):
+        raise ValueError(f"{location}.{key}: unexpected type {type(value).__name__}")
+    return value
@@ -0,0 +1,107 @@
+"""
+agent/utils/bom_stream.py
+
+This module parses part JSON files incrementally with ijson, validating and
+yielding every part without its BOM as soon as its closing brace is read, so
+neither the raw file nor a nested model tree has to be held in memory (see
+`BOMStore.from_file`).
+"""
+
+from typing import BinaryIO, Iterator, NamedTuple
+
+import ijson
+
+from schema import Part
+
+
+class StreamedPart(NamedTuple):
+    """
+    A part parsed from a BOM file, without its BOM. Parts are yielded children
+    first, but `index` and `parent` are the part's position in document
+    (pre-)order, the same indices `flatten_bom` gives. The root has a parent
+    of -1. `has_bom` tells whether the JSON had a "bom" list, possibly empty.
+    """
+
+    index: int
+    parent: int
+    part: Part
+    has_bom: bool
+
+
+class _Frame:
+    """A part whose JSON object is still being parsed."""
+
+    __slots__ = ("index", "parent", "fields", "has_bom", "in_bom")
+
+    def __init__(self, index: int, parent: int):
+        self.index = index
+        self.parent = parent
+        self.fields: dict = {}
+        self.has_bom = False
+        # Whether the "bom" array is open, so objects are its items
+        self.in_bom = False
+
+
+def iter_parts(file: BinaryIO) -> Iterator[StreamedPart]:
+    """
+    Parse a part JSON file, e.g. one of data/parts/*.json, yielding each part
+    once it and its BOM are complete.
+
+    Every part is validated as a `Part` on its own and yielded without its BOM.
+    Nothing is kept after a part is yielded, so the memory used does not grow
+    with the size of the file.
+
+    Args:
+        file (BinaryIO): The JSON file, opened in binary mode.
+
+    Raises:
+        ValueError: If the JSON is malformed or a part fails validation.
+    """
+
+    frames: list[_Frame] = []
+    count = 0
+    # Builder of the current non-BOM field value, and the nesting depth inside it
+    builder: ijson.ObjectBuilder | None = None
+    depth = 0
+    key: str | None = None
+
+    try:
+        for event, value in ijson.basic_parse(file, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if event in ("start_map", "start_array"):
+                    depth += 1
+                elif event in ("end_map", "end_array"):
+                    depth -= 1
+                if depth == 0:
+                    frames[-1].fields[key] = builder.value
+                    builder = None
+                continue
+
+            if event == "start_map":
+                # The root object or an item of the current part's BOM
+                if frames and (key != "bom" or not frames[-1].in_bom):
+                    raise ValueError(f"Unexpected object in part {count - 1}")
+                frames.append(_Frame(count, frames[-1].index if frames else -1))
+                count += 1
+            elif event == "map_key":
+                key = value
+                if key != "bom":
+                    builder = ijson.ObjectBuilder()
+            elif event == "start_array" and key == "bom":
+                frames[-1].has_bom = frames[-1].in_bom = True
+            elif event == "null" and key == "bom":
+                frames[-1].has_bom = False
+            elif event == "end_array" and key == "bom":
+                frames[-1].in_bom = False
+                key = None
+            elif event == "end_map":
+                frame = frames.pop()
+                part = Part.model_validate(frame.fields)
+                yield StreamedPart(frame.index, frame.parent, part, frame.has_bom)
+                if frames:
+                    key = "bom"
+            else:
+                raise ValueError(f"Unexpected JSON {event} in part {count - 1}")
+    except ijson.JSONError as e:
+        raise ValueError(f"Malformed part JSON: {e}") from e
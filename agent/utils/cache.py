@@ -0,0 +1,166 @@
+"""
+agent/utils/cache.py
+
+This module provides a persistent, content-addressed cache for LLM results
+backed by SQLite, with LRU and TTL eviction and hit/miss counters.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from agent.utils.run_counters import count
+
+CACHE_PATH = os.getenv(
+    "COMPLIANCE_CACHE_PATH", os.path.join("data", "cache", "llm_cache.sqlite")
+)
+MAX_ENTRIES = 10_000
+TTL_SECONDS = 30 * 24 * 60 * 60
+# Access times of cache hits are written to disk in batches of this many
+TOUCH_BATCH = 256
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a cache key as the SHA-256 of the canonical JSON encoding of `parts`.
+    Dictionary keys are sorted so equal content always hashes to the same key.
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    A namespaced key/value cache stored in a SQLite database.
+
+    Entries older than `ttl` seconds are treated as misses and removed, and once
+    a namespace holds more than `max_entries` entries the least recently used
+    ones are evicted. The cache is safe to share between threads.
+
+    Hits only record their access time in memory, the access times are written
+    in batches (see `flush`), so a lookup never commits to disk.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        path: str = CACHE_PATH,
+        max_entries: int = MAX_ENTRIES,
+        ttl: float | None = TTL_SECONDS,
+    ):
+        self.namespace = namespace
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        # Access times of hits not yet written, by key
+        self._touched: dict[str, float] = {}
+        atexit.register(self.flush)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connect lazily so importing the module does not touch the disk
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value, created_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            now = time.time()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                connection.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                connection.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                count(self.namespace, "misses")
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= TOUCH_BATCH:
+                self._write_touches(connection)
+                connection.commit()
+            self.hits += 1
+            count(self.namespace, "hits")
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store `value` under `key`, evicting least recently used entries if full."""
+        with self._lock:
+            connection = self._connect()
+            now = time.time()
+            self._touched.pop(key, None)
+            # Evict by up to date access times
+            self._write_touches(connection)
+            connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, value, now, now),
+            )
+            connection.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache WHERE namespace = ? "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+            connection.commit()
+
+    def flush(self) -> None:
+        """Write the pending access times of cache hits."""
+        with self._lock:
+            if self._touched:
+                connection = self._connect()
+                self._write_touches(connection)
+                connection.commit()
+
+    def close(self) -> None:
+        """Write the pending access times and close the database connection."""
+        self.flush()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _write_touches(self, connection: sqlite3.Connection) -> None:
+        connection.executemany(
+            "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            [(at, self.namespace, key) for key, at in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return the hit and miss counters of this cache instance."""
+        return {"hits": self.hits, "misses": self.misses}
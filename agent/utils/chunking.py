@@ -0,0 +1,77 @@
+"""
+agent/utils/chunking.py
+
+This module packs consecutive regulation pages into extraction prompts of a
+bounded token size, repeating the tail of each chunk at the start of the next
+one so tables that cross a chunk boundary are seen whole at least once.
+"""
+
+from typing import Iterable, Iterator
+
+# Tokens of the previous chunk repeated at the start of the next one
+OVERLAP_TOKENS = 200
+
+PAGE_SEPARATOR = "\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt fragment (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def tail(text: str, tokens: int) -> str:
+    """
+    Return the last whole lines of `text` that fit in `tokens`, so a repeated
+    table starts at a row boundary.
+    """
+
+    lines: list[str] = []
+    size = 0
+    for line in reversed(text.splitlines()):
+        size += estimate_tokens(line)
+        if size > tokens:
+            break
+        lines.append(line)
+    return "\n".join(reversed(lines))
+
+
+def chunk_pages(
+    pages: Iterable[str], token_budget: int, overlap_tokens: int = OVERLAP_TOKENS
+) -> Iterator[str]:
+    """
+    Lazily pack consecutive pages into chunks of at most `token_budget` tokens.
+
+    Each chunk after the first starts with the last `overlap_tokens` tokens of
+    the previous chunk, unless the next page leaves no room for them. A single
+    page larger than the budget becomes a chunk of its own, it is never cut.
+
+    Args:
+        pages (Iterable[str]): Page texts in document order.
+        token_budget (int): Maximum estimated tokens of a chunk.
+        overlap_tokens (int): Estimated tokens repeated from the previous chunk.
+
+    Yields:
+        str: The text of each chunk, pages joined by a blank line.
+    """
+
+    chunk: list[str] = []
+    size = 0
+    # Whether the chunk holds more than the overlap carried from the last one
+    has_new_pages = False
+    for page in pages:
+        page_tokens = estimate_tokens(page)
+        if has_new_pages and size + page_tokens > token_budget:
+            text = PAGE_SEPARATOR.join(chunk)
+            yield text
+            overlap = tail(text, overlap_tokens) if overlap_tokens > 0 else ""
+            chunk = [overlap] if overlap else []
+            size = estimate_tokens(overlap) if overlap else 0
+            has_new_pages = False
+        if not has_new_pages and size + page_tokens > token_budget:
+            # No room for the overlap next to this page
+            chunk, size = [], 0
+        chunk.append(page)
+        size += page_tokens
+        has_new_pages = True
+    if has_new_pages:
+        yield PAGE_SEPARATOR.join(chunk)
@@ -18,12 +18,18 @@ def make_compliant(
     juris_sub: Substance | None,
     ambiguous: bool,
     note: str,
+    concentration: Tolerance | None = None,
 ) -> CompliantSubstance:
-    """Create CompliantSubstance record."""
+    """
+    Create CompliantSubstance record. `concentration` replaces the part
+    substance's own value and unit, e.g. once converted to the jurisdiction's.
+    """
     return CompliantSubstance(
         substance_name=part_sub.name,
         substance_standard_name=part_sub.standardized_name,
-        substance_concentration=make_tolerance(part_sub),
+        substance_concentration=(
+            make_tolerance(part_sub) if concentration is None else concentration
+        ),
         jurisdiction_tolerance=(
             make_tolerance(juris_sub)
             if juris_sub
@@ -34,12 +40,19 @@ def make_compliant(
     )
 
 
-def make_violation(part_sub: Substance, juris_sub: Substance, reason: str) -> Violation:
-    """Create Violation record."""
+def make_violation(
+    part_sub: Substance,
+    juris_sub: Substance,
+    reason: str,
+    concentration: Tolerance | None = None,
+) -> Violation:
+    """Create Violation record, see `make_compliant` for `concentration`."""
     return Violation(
         substance_name=part_sub.name,
         substance_standard_name=part_sub.standardized_name,
-        substance_concentration=make_tolerance(part_sub),
+        substance_concentration=(
+            make_tolerance(part_sub) if concentration is None else concentration
+        ),
         jurisdiction_tolerance=make_tolerance(juris_sub),
         violation_reason=reason,
     )
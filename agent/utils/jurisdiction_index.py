@@ -0,0 +1,207 @@
+"""
+agent/utils/jurisdiction_index.py
+
+This module provides JurisdictionIndex, a hash based index over a jurisdiction's
+substance list with O(1) lookups by name, standardized name, casefolded name
+and bundled synonyms (aliases, CAS numbers and element symbols).
+"""
+
+from typing import Iterable
+
+from schema import Substance
+
+# Bundled synonyms: canonical identifier -> names, abbreviations and CAS numbers
+SYNONYMS: dict[str, list[str]] = {
+    # RoHS Annex II
+    "Pb": ["Lead", "7439-92-1"],
+    "Hg": ["Mercury", "7439-97-6"],
+    "Cd": ["Cadmium", "7440-43-9"],
+    "Cr(VI)": [
+        "Hexavalent chromium",
+        "Chromium VI",
+        "Chromium(VI)",
+        "Chromium (VI)",
+        "Cr6+",
+        "Cr VI",
+        "18540-29-9",
+    ],
+    "PBB": ["Polybrominated biphenyls", "Polybrominated biphenyl", "PBBs"],
+    "PBDE": [
+        "Polybrominated diphenyl ethers",
+        "Polybrominated diphenyl ether",
+        "PBDEs",
+    ],
+    "DEHP": [
+        "Bis(2-ethylhexyl) phthalate",
+        "Di(2-ethylhexyl) phthalate",
+        "Diethylhexyl phthalate",
+        "117-81-7",
+    ],
+    "BBP": ["Butyl benzyl phthalate", "Benzyl butyl phthalate", "BBzP", "85-68-7"],
+    "DBP": ["Dibutyl phthalate", "Di-n-butyl phthalate", "84-74-2"],
+    "DIBP": ["Diisobutyl phthalate", "Di-isobutyl phthalate", "84-69-5"],
+    "HBCDD": ["Hexabromocyclododecane", "HBCD", "25637-99-4"],
+    # Other commonly regulated or reported elements
+    "As": ["Arsenic", "7440-38-2"],
+    "Sb": ["Antimony", "7440-36-0"],
+    "Be": ["Beryllium", "7440-41-7"],
+    "Ni": ["Nickel", "7440-02-0"],
+    "Co": ["Cobalt", "7440-48-4"],
+    "Cr": ["Chromium", "7440-47-3"],
+    "Sn": ["Tin", "7440-31-5"],
+    "Cu": ["Copper", "7440-50-8"],
+    "Zn": ["Zinc", "7440-66-6"],
+    "Al": ["Aluminium", "Aluminum", "7429-90-5"],
+    "Fe": ["Iron", "7439-89-6"],
+    "Ag": ["Silver", "7440-22-4"],
+    "Au": ["Gold", "7440-57-5"],
+    "Ba": ["Barium", "7440-39-3"],
+    "Se": ["Selenium", "7782-49-2"],
+    "Tl": ["Thallium", "7440-28-0"],
+    "Br": ["Bromine", "7726-95-6"],
+    "Cl": ["Chlorine", "7782-50-5"],
+}
+
+
+# Unicode dashes and minus signs, all normalized to "-"
+DASHES = str.maketrans({dash: "-" for dash in "‐‑‒–—―−"})
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a substance name for lookups: casefold, unify dashes and drop all
+    whitespace, so "Chromium (VI)" and "chromium(VI)" share the same key.
+    """
+    return "".join(name.casefold().translate(DASHES).split())
+
+
+# Normalized synonym -> canonical identifier
+SYNONYM_INDEX: dict[str, str] = {
+    normalize_name(alias): canonical
+    for canonical, aliases in SYNONYMS.items()
+    for alias in [canonical, *aliases]
+}
+
+
+def canonical_name(substance: Substance) -> str | None:
+    """Return the bundled canonical identifier of a substance, if it has one."""
+    for name in (substance.name, substance.standardized_name):
+        canonical = SYNONYM_INDEX.get(normalize_name(name)) if name else None
+        if canonical is not None:
+            return canonical
+    return None
+
+
+class JurisdictionIndex:
+    """
+    Index over a jurisdiction's substances, built once and shared by the merge,
+    mapping and compliance steps.
+
+    Substances are kept unique by casefolded name: `upsert` replaces an existing
+    entry in place (keeping its position) or appends a new one. The lookup maps
+    are rebuilt lazily after the substances change.
+
+    Names claimed by several substances with different tolerances resolve to
+    None in the alias lookup, as the index cannot tell which one is meant.
+    """
+
+    def __init__(self, substances: Iterable[Substance] = ()):
+        self._by_casefold: dict[str, Substance] = {}
+        self._by_standard_name: dict[str, Substance] = {}
+        self._exact: dict[str, Substance | None] = {}
+        self._normalized: dict[str, Substance | None] = {}
+        self._stale = True
+        for substance in substances:
+            self.upsert(substance)
+
+    def upsert(self, substance: Substance) -> None:
+        """Insert `substance`, replacing any substance with the same casefolded name."""
+        self._by_casefold[substance.name.casefold()] = substance
+        self._stale = True
+
+    @property
+    def substances(self) -> list[Substance]:
+        """The indexed substances, in first insertion order."""
+        return list(self._by_casefold.values())
+
+    def __len__(self) -> int:
+        return len(self._by_casefold)
+
+    def _build(self):
+        by_standard_name: dict[str, Substance] = {}
+        exact: dict[str, Substance | None] = {}
+        normalized: dict[str, Substance | None] = {}
+        for substance in self._by_casefold.values():
+            by_standard_name.setdefault(substance.standardized_name, substance)
+            names = [n for n in (substance.name, substance.standardized_name) if n]
+            for name in names:
+                self._add(exact, name, substance)
+            keys = {normalize_name(name) for name in names}
+            # Expand with every synonym of the substance's canonical identifier
+            canonical = canonical_name(substance)
+            if canonical is not None:
+                keys.update(
+                    normalize_name(alias) for alias in [canonical, *SYNONYMS[canonical]]
+                )
+            for key in keys:
+                self._add(normalized, key, substance)
+        self._by_standard_name = by_standard_name
+        self._exact = exact
+        self._normalized = normalized
+        self._stale = False
+
+    def _ensure(self):
+        if self._stale:
+            self._build()
+
+    @staticmethod
+    def _add(index: dict[str, Substance | None], key: str, substance: Substance):
+        if key not in index:
+            index[key] = substance
+            return
+        existing = index[key]
+        if existing is None:
+            return
+        if existing.value is None:
+            # Prefer the entry that actually carries a tolerance
+            index[key] = substance
+        elif substance.value is not None and (
+            substance.value,
+            substance.unit,
+            substance.tolerance_condition,
+        ) != (existing.value, existing.unit, existing.tolerance_condition):
+            # Conflicting tolerances, the name is ambiguous
+            index[key] = None
+
+    def get_by_name(self, name: str) -> Substance | None:
+        """Look up a substance by its casefolded name."""
+        return self._by_casefold.get(name.casefold())
+
+    def find_by_standard_name(self, standard_name: str) -> Substance | None:
+        """Indexed equivalent of `Substance.find_by_standard_name` (first match)."""
+        self._ensure()
+        return self._by_standard_name.get(standard_name)
+
+    def find(self, substance: Substance) -> Substance | None:
+        """
+        Return the indexed substance matching `substance`: first by exact name or
+        standardized name, then by normalized name, synonym, CAS number or
+        element symbol.
+        """
+        self._ensure()
+        names = [n for n in (substance.name, substance.standardized_name) if n]
+        for name in names:
+            match = self._exact.get(name)
+            if match is not None:
+                return match
+        for name in names:
+            key = normalize_name(name)
+            match = self._normalized.get(key)
+            if match is None:
+                # The substance may use a synonym the jurisdiction list does not
+                canonical = SYNONYM_INDEX.get(key)
+                if canonical is not None:
+                    match = self._normalized.get(normalize_name(canonical))
+            if match is not None:
+                return match
+        return None
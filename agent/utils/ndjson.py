@@ -0,0 +1,44 @@
+"""
+agent/utils/ndjson.py
+
+This module provides a thread-safe writer for newline delimited JSON (NDJSON)
+files, used to stream flat compliance records while a check is still running.
+"""
+
+import json
+import os
+import threading
+from typing import Any
+
+
+class NDJSONWriter:
+    """
+    Appends one JSON record per line to a file and flushes after every record,
+    so consumers tailing the file see each record as soon as it is written.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "NDJSONWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
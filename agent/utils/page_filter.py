@@ -0,0 +1,86 @@
+"""
+agent/utils/page_filter.py
+
+This module provides a cheap, local relevance score for regulation pages, so
+pages without any substance limits (recitals, signatures, boilerplate) can be
+skipped before the LLM extraction.
+"""
+
+import re
+
+from agent.utils.jurisdiction_index import SYNONYMS
+
+# Pages scoring below this are not sent to the LLM
+MIN_SCORE = 3.0
+
+# A number followed by a concentration or mass unit, e.g. "0,1 %" or "1000 ppm"
+CONCENTRATION = re.compile(
+    r"\d+(?:[.,]\d+)?\s*(?:%|wt\s*%|ppm|ppb|mg\s*/\s*kg|µg\s*/\s*g|g\s*/\s*kg|mg|µg)"
+    r"(?![a-z])",
+    re.IGNORECASE,
+)
+
+# Wording used for limits, restrictions and prohibitions
+LIMIT_TERMS = re.compile(
+    r"\b(?:maximum|minimum|concentrations?|limits?|threshold|exceed\w*|tolerat\w*|"
+    r"restrict\w*|prohibit\w*|ban(?:ned)?|not be present|not permitted|"
+    r"shall not contain|by weight|homogeneous material)\b",
+    re.IGNORECASE,
+)
+
+# Substance names, abbreviations and CAS numbers of the bundled synonyms, and
+# generic chemical wording for substances missing from them
+SUBSTANCE_TERMS = re.compile(
+    r"(?<![\w-])(?:"
+    + "|".join(
+        sorted(
+            (
+                re.escape(name)
+                for canonical, aliases in SYNONYMS.items()
+                for name in [canonical, *aliases]
+                # Element symbols are too short to match safely in prose
+                if len(name) > 2
+            ),
+            key=len,
+            reverse=True,
+        )
+    )
+    + r"|\w*(?:phthalate|chloride|oxide|bromide|fluoride|sulfate|sulphate|nitrate|"
+    r"phenol|benzene)s?|\d{2,7}-\d{2}-\d)(?![\w-])",
+    re.IGNORECASE,
+)
+
+# Jurisdiction and legal instrument wording, a weak signal on its own
+JURISDICTION_TERMS = re.compile(
+    r"\b(?:annex|directive|regulation|member states?|union|jurisdiction)\b",
+    re.IGNORECASE,
+)
+
+
+def score_page(text: str) -> float:
+    """
+    Score how likely a page defines substance limits.
+
+    Concentrations with units weigh the most, followed by substance names
+    appearing together with limit wording. Substance or jurisdiction terms
+    alone only add a little.
+
+    Returns:
+        float: The relevance score, 0 for pages without any signal.
+    """
+
+    concentrations = len(CONCENTRATION.findall(text))
+    substances = len(SUBSTANCE_TERMS.findall(text))
+    limits = len(LIMIT_TERMS.findall(text))
+    jurisdictions = len(JURISDICTION_TERMS.findall(text))
+
+    score = 3.0 * min(concentrations, 3)
+    if substances and limits:
+        score += 3.0
+    score += 0.5 * min(substances, 4) + 0.5 * min(jurisdictions, 2)
+    return score
+
+
+def is_candidate(text: str, min_score: float = MIN_SCORE) -> bool:
+    """True if the page should be sent to the LLM extraction."""
+    return score_page(text) >= min_score
@@ -0,0 +1,122 @@
+"""
+agent/utils/part_mass.py
+
+This module computes the mass of every part of a BOM from the absolute amounts
+(kg, g, mg, ...) of its own substances, so that an absolute amount can be checked
+against a concentration limit (%, ppm, ...) as a mass fraction of its part.
+"""
+
+from typing import Sequence
+
+from agent.utils.jurisdiction_index import JurisdictionIndex
+from agent.utils.unit_converter import UnitConverter
+from schema import Part, Substance
+
+
+def has_absolute_amounts(part: Part) -> bool:
+    """True if the part lists any substance as an absolute mass."""
+    return any(
+        substance.unit is not None
+        and UnitConverter.category(substance.unit) == "weight"
+        for substance in part.substances
+    )
+
+
+def own_mass(part: Part) -> float | None:
+    """
+    Mass in kg of the substances of a part (ignoring its BOM). Substances given
+    as a concentration are a share of that mass and add nothing to it.
+
+    Returns:
+        float | None: The mass, or None if any substance amount is missing or
+        not a mass (e.g. a volume), since the total would be unknown.
+    """
+
+    mass = 0.0
+    for substance in part.substances:
+        if substance.value is None or substance.unit is None:
+            return None
+        category = UnitConverter.category(substance.unit)
+        if category == "weight":
+            mass += UnitConverter.convert(substance.value, substance.unit, "kg")
+        elif category != "concentration":
+            return None
+    return mass
+
+
+def part_masses(parts: Sequence[Part]) -> list[float | None]:
+    """
+    Compute the mass of every part of a flattened BOM. A substance is a share of
+    the part that lists it, not of the part's BOM, so only the part's own
+    substances count (see `own_mass`).
+
+    Args:
+        parts (Sequence[Part]): The parts of a flattened BOM.
+
+    Returns:
+        list[float | None]: The mass in kg of each part, None where it is
+        unknown or zero.
+    """
+
+    return [own_mass(part) or None for part in parts]
+
+
+def bom_masses(parts: Sequence[Part], parents: Sequence[int]) -> list[float | None]:
+    """
+    Aggregate the mass of every part and its BOM in one post-order pass. These
+    are assembly masses for reporting, substance amounts are checked against
+    the part's own mass (see `part_masses`).
+
+    Args:
+        parts (Sequence[Part]): The parts of a flattened BOM, parents first.
+        parents (Sequence[int]): The index of each part's parent, -1 for the root.
+
+    Returns:
+        list[float | None]: The mass in kg of each part including its BOM, None
+        where the mass of any part of the subtree is unknown.
+    """
+
+    masses: list[float | None] = [own_mass(part) for part in parts]
+    # Children come after their parents, so the reverse order is post-order
+    for index in reversed(range(len(parts))):
+        parent = parents[index]
+        if parent < 0 or masses[parent] is None:
+            continue
+        mass = masses[index]
+        masses[parent] = None if mass is None else masses[parent] + mass
+    return masses
+
+
+def is_mass_fraction_check(
+    part_substance: Substance, jurisidiction_substance: Substance
+) -> bool:
+    """
+    True if the part substance is an absolute mass of the same substance a
+    jurisdiction limits by concentration.
+    """
+
+    if (
+        part_substance.value is None
+        or part_substance.unit is None
+        or jurisidiction_substance.value is None
+        or jurisidiction_substance.unit is None
+        or UnitConverter.category(part_substance.unit) != "weight"
+        or UnitConverter.category(jurisidiction_substance.unit) != "concentration"
+    ):
+        return False
+    # The mapping may pair different substances, only the same one is a fraction
+    return JurisdictionIndex([jurisidiction_substance]).find(part_substance) is not None
+
+
+def mass_fraction(part_substance: Substance, part_mass: float, unit: str) -> float:
+    """
+    Return the mass fraction of an absolute part substance in its part, in the
+    given concentration unit.
+    """
+
+    fraction = (
+        UnitConverter.convert(part_substance.value, part_substance.unit, "kg")
+        / part_mass
+    )
+    # A mass fraction of 1 is 10^6 mg/kg
+    return UnitConverter.convert(fraction * 1e6, "mg/kg", unit)
@@ -0,0 +1,47 @@
+"""
+agent/utils/regulation_delta.py
+
+This module compares two versions of a jurisdiction's substance list, so a
+regulation change (a substance added, removed or its limit tightened) can be
+re-checked against stored results without mapping every part again.
+"""
+
+from typing import NamedTuple
+
+from schema import Jurisdiction, Substance
+
+
+class ToleranceDelta(NamedTuple):
+    """
+    The substances of a jurisdiction that differ between two versions, matched
+    by casefolded name as in `JurisdictionIndex`. `changed` holds the new
+    version of each substance whose standardized name or tolerance changed.
+    """
+
+    added: list[Substance]
+    removed: list[Substance]
+    changed: list[Substance]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def tolerance_delta(
+    previous: Jurisdiction, jurisdiction: Jurisdiction
+) -> ToleranceDelta:
+    """
+    Compute the delta from `previous.substance_tolerances` to
+    `jurisdiction.substance_tolerances`, in the order of their substance lists.
+    """
+
+    before = {s.name.casefold(): s for s in previous.substance_tolerances}
+    after = {s.name.casefold(): s for s in jurisdiction.substance_tolerances}
+    return ToleranceDelta(
+        added=[substance for name, substance in after.items() if name not in before],
+        removed=[substance for name, substance in before.items() if name not in after],
+        changed=[
+            substance
+            for name, substance in after.items()
+            if name in before and before[name] != substance
+        ],
+    )
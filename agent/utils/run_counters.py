@@ -0,0 +1,66 @@
+"""
+agent/utils/run_counters.py
+
+This module collects the counters of one run (cache hits and misses, local
+substance resolutions) in a context variable, so runs that overlap in one
+process, e.g. the part files of batch.py, each count only their own work.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Iterator
+
+
+class RunCounters:
+    """Thread-safe counters of one run, by source (e.g. a cache namespace)."""
+
+    def __init__(self):
+        self._counts: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, source: str, name: str, count: int = 1) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(source, {})
+            counts[name] = counts.get(name, 0) + count
+
+    def get(self, source: str, *names: str) -> dict[str, int]:
+        """The counts of a source, 0 for the names never counted."""
+        with self._lock:
+            counts = self._counts.get(source, {})
+            return {name: counts.get(name, 0) for name in names}
+
+
+_current: ContextVar[RunCounters | None] = ContextVar("run_counters", default=None)
+
+
+def count(source: str, name: str, count: int = 1) -> None:
+    """Add to a counter of the current run, if any (see `collect`)."""
+    counters = _current.get()
+    if counters is not None:
+        counters.add(source, name, count)
+
+
+@contextmanager
+def collect() -> Iterator[RunCounters]:
+    """
+    Count into new counters for the duration of the block. Work submitted to a
+    `ContextExecutor` from the block counts into them as well.
+    """
+    counters = RunCounters()
+    token = _current.set(counters)
+    try:
+        yield counters
+    finally:
+        _current.reset(token)
+
+
+class ContextExecutor(ThreadPoolExecutor):
+    """
+    A ThreadPoolExecutor that runs every task in a copy of the context it was
+    submitted from, so tasks count into the run that submitted them.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(copy_context().run, fn, *args, **kwargs)
@@ -0,0 +1,101 @@
+"""
+agent/utils/substance_resolver.py
+
+This module maps part substances to jurisdiction substances locally, using the
+name, synonym, CAS number and element symbol lookups of a JurisdictionIndex,
+so that only the substances it cannot resolve need to be sent to the LLM.
+"""
+
+from agent.models import SubstanceMapping
+from agent.utils.jurisdiction_index import JurisdictionIndex
+from agent.utils.run_counters import count
+from agent.utils.unit_converter import UnitConverter
+from schema import Substance
+
+
+def is_comparable(part_substance: Substance, jurisdiction_substance: Substance):
+    """
+    Decide locally whether two substances measure the same physical quantity.
+
+    Returns:
+        bool | None: True or False when the units settle it, None when they are
+        missing or unknown and the decision must be left to the LLM.
+    """
+    # Prohibited substances (value 0 without unit) apply to any amount
+    if jurisdiction_substance.value == 0.0 and jurisdiction_substance.unit is None:
+        return True
+    if part_substance.unit is None or jurisdiction_substance.unit is None:
+        return None
+    part_category = UnitConverter.category(part_substance.unit)
+    jurisdiction_category = UnitConverter.category(jurisdiction_substance.unit)
+    if part_category is None or jurisdiction_category is None:
+        return None
+    return part_category == jurisdiction_category
+
+
+class SubstanceResolver:
+    """
+    Resolves part substances against one jurisdiction's substance list, using
+    the lookups of its `JurisdictionIndex`.
+    """
+
+    def __init__(self, index: JurisdictionIndex):
+        self.index = index
+
+    def resolve(
+        self, substances: list[Substance]
+    ) -> tuple[list[SubstanceMapping | None], list[Substance]]:
+        """
+        Map as many substances as possible locally. Only positive matches are
+        resolved, a substance without a match may still fall under a group
+        entry (e.g. "Cadmium and its compounds") and is left to the LLM.
+
+        Returns:
+            tuple[list[SubstanceMapping | None], list[Substance]]:
+                - The local mapping of each substance, None where unresolved.
+                - The unresolved substances, to be mapped by the LLM.
+        """
+        mappings: list[SubstanceMapping | None] = []
+        leftovers: list[Substance] = []
+        for substance in substances:
+            match = self.index.find(substance)
+            comparable = None if match is None else is_comparable(substance, match)
+            if comparable is None:
+                mappings.append(None)
+                leftovers.append(substance)
+            else:
+                mappings.append(
+                    SubstanceMapping(
+                        part_substance=substance,
+                        jurisidiction_substance=match,
+                        is_comparable=comparable,
+                    )
+                )
+        # Substances resolved locally / left to the LLM, counted per run
+        count("substance_resolution", "resolved", len(substances) - len(leftovers))
+        count("substance_resolution", "sent_to_llm", len(leftovers))
+        return mappings, leftovers
+
+
+def merge_mappings(
+    substances: list[Substance],
+    local: list[SubstanceMapping | None],
+    llm_mappings: list[SubstanceMapping],
+) -> list[SubstanceMapping]:
+    """
+    Fill the unresolved slots of `local` with the LLM mappings, matched by part
+    substance name, keeping the part's substance order. LLM mappings that do not
+    match an unresolved substance are appended as returned.
+    """
+    by_name: dict[str, list[SubstanceMapping]] = {}
+    for mapping in llm_mappings:
+        by_name.setdefault(mapping.part_substance.name, []).append(mapping)
+
+    merged: list[SubstanceMapping] = []
+    for substance, mapping in zip(substances, local):
+        if mapping is None and by_name.get(substance.name):
+            mapping = by_name[substance.name].pop(0)
+        if mapping is not None:
+            merged.append(mapping)
+    merged.extend(mapping for mappings in by_name.values() for mapping in mappings)
+    return merged
@@ -1,3 +1,9 @@
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+
 class UnitConverter:
     # Base units for categories
     BASES = {
@@ -5,7 +11,7 @@ class UnitConverter:
         "distance": "m",
         "area": "m²",
         "volume": "m³",
-        "concentration": "%",  # concentration conversions are special
+        "concentration": "mg/kg",
     }
 
     # Conversion factors to base units (category, factor)
@@ -46,54 +52,178 @@ class UnitConverter:
         "gallon": ("volume", 0.00378541),
         "pint": ("volume", 0.000473176),
         "cup": ("volume", 0.000236588),
-        # Concentration (special: % ↔ ppm)
-        "%": ("concentration", None),
-        "mg/kg": ("concentration", None),
-        "ppm": ("concentration", None),
+        # Concentration (base = mg/kg, 1% = 10000 mg/kg)
+        "%": ("concentration", 10000),
+        "wt%": ("concentration", 10000),
+        "g/kg": ("concentration", 1000),
+        "mg/kg": ("concentration", 1),
+        "ppm": ("concentration", 1),
+        "µg/g": ("concentration", 1),
+        "ppb": ("concentration", 0.001),
+        "µg/kg": ("concentration", 0.001),
+    }
+
+    # Alternative spellings found in supplier data, matched after
+    # whitespace removal and casefolding (see normalize)
+    ALIASES = {
+        "percent": "%",
+        "pct": "%",
+        "wt.%": "wt%",
+        "%wt": "wt%",
+        "%w/w": "wt%",
+        "w/w%": "wt%",
+        "weight%": "wt%",
+        "ppmw": "ppm",
+        "ppmwt": "ppm",
+        "ppbw": "ppb",
+        "ug/g": "µg/g",
+        "μg/g": "µg/g",
+        "ug/kg": "µg/kg",
+        "μg/kg": "µg/kg",
+        "kgs": "kg",
+        "grams": "g",
+        "gram": "g",
+        "mm2": "mm²",
+        "cm2": "cm²",
+        "m2": "m²",
+        "km2": "km²",
+        "in2": "in²",
+        "ft2": "ft²",
+        "yd2": "yd²",
+        "mm3": "mm³",
+        "cm3": "cm³",
+        "m3": "m³",
+        "in3": "in³",
+        "ft3": "ft³",
+        "l": "L",
+        "ml": "mL",
     }
 
+    # Compiled tables, indexed by unit id (see _compile)
+    UNITS: list[str] = []
+    CATEGORIES: np.ndarray
+    BASE_FACTORS: np.ndarray
+    # COMPATIBLE[i, j] is True if unit i converts to unit j
+    COMPATIBLE: np.ndarray
+
     @classmethod
-    def convert(cls, value: float, from_unit: str, to_unit: str) -> float:
-        from_unit = from_unit.strip()
-        to_unit = to_unit.strip()
+    def _compile(cls):
+        cls.UNITS = list(cls.FACTORS)
+        categories = list(cls.BASES)
+        cls.CATEGORIES = np.array(
+            [categories.index(cls.FACTORS[unit][0]) for unit in cls.UNITS]
+        )
+        cls.BASE_FACTORS = np.array(
+            [cls.FACTORS[unit][1] for unit in cls.UNITS], dtype=float
+        )
+        cls.COMPATIBLE = cls.CATEGORIES[:, None] == cls.CATEGORIES[None, :]
+        cls._ids = {unit: index for index, unit in enumerate(cls.UNITS)}
+        cls._folded_ids = {
+            unit.casefold(): index for index, unit in enumerate(cls.UNITS)
+        }
+        cls._folded_ids.update(
+            (alias, cls._ids[unit]) for alias, unit in cls.ALIASES.items()
+        )
 
-        if from_unit == to_unit:
-            return value
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def unit_id(unit: str) -> int:
+        """
+        Normalize a unit string to its unit id: exact match first, then with all
+        whitespace removed, then casefolded or through ALIASES.
+
+        Raises:
+            KeyError: If the unit is not known.
+        """
+        cls = UnitConverter
+        if unit in cls._ids:
+            return cls._ids[unit]
+        compact = "".join(unit.split())
+        if compact in cls._ids:
+            return cls._ids[compact]
+        return cls._folded_ids[compact.casefold()]
+
+    @classmethod
+    def normalize(cls, unit: str) -> str:
+        """Return the canonical spelling of a unit string."""
+        return cls.UNITS[cls.unit_id(unit)]
 
-        # Handle concentration separately
-        if (
-            cls.FACTORS[from_unit][0] == "concentration"
-            or cls.FACTORS[to_unit][0] == "concentration"
-        ):
-            return cls._convert_concentration(value, from_unit, to_unit)
+    @classmethod
+    def category(cls, unit: str) -> str | None:
+        """Return the category of a unit (e.g. "weight"), None if it is unknown."""
+        try:
+            return cls.FACTORS[cls.normalize(unit)][0]
+        except KeyError:
+            return None
 
-        cat_from, factor_from = cls.FACTORS[from_unit]
-        cat_to, factor_to = cls.FACTORS[to_unit]
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def factors(from_unit: str, to_unit: str) -> tuple[float, float]:
+        """
+        Return the base factors (f_from, f_to) of a conversion, so that the
+        converted value is `value * f_from / f_to`. Identical units need no
+        conversion, even when they are not known.
 
-        if cat_from != cat_to:
+        Raises:
+            KeyError: If a unit is not known.
+            ValueError: If the units measure different quantities.
+        """
+        cls = UnitConverter
+        if from_unit.strip() == to_unit.strip():
+            return 1.0, 1.0
+        from_id = cls.unit_id(from_unit)
+        to_id = cls.unit_id(to_unit)
+        if from_id == to_id:
+            return 1.0, 1.0
+        if not cls.COMPATIBLE[from_id, to_id]:
             raise ValueError(f"Incompatible units: {from_unit} vs {to_unit}")
+        return float(cls.BASE_FACTORS[from_id]), float(cls.BASE_FACTORS[to_id])
+
+    @classmethod
+    def convert(cls, value: float, from_unit: str, to_unit: str) -> float:
+        if from_unit.strip() == to_unit.strip():
+            return value
 
+        factor_from, factor_to = cls.factors(from_unit, to_unit)
         # convert to base, then to target
-        base_value = value * factor_from
-        return base_value / factor_to
+        return value * factor_from / factor_to
 
-    @staticmethod
-    def _convert_concentration(value: float, from_unit: str, to_unit: str) -> float:
-        # Normalize synonyms
-        aliases = {"percent": "%", "ppm": "mg/kg"}
-        from_unit = aliases.get(from_unit, from_unit)
-        to_unit = aliases.get(to_unit, to_unit)
-
-        # 1% = 10000 mg/kg
-        if from_unit == "%" and to_unit in ("mg/kg", "ppm"):
-            return value * 10000
-        if from_unit in ("mg/kg", "ppm") and to_unit == "%":
-            return value / 10000
-        if from_unit in ("mg/kg", "ppm") and to_unit in ("mg/kg", "ppm"):
-            return value
-        if from_unit == "%" and to_unit == "%":
-            return value
+    @classmethod
+    def convert_many(
+        cls,
+        values: Sequence[float] | np.ndarray,
+        from_units: str | Sequence[str],
+        to_units: str | Sequence[str],
+    ) -> np.ndarray:
+        """
+        Vectorized `convert`. Units are either one unit for all values or one
+        unit per value.
 
-        raise ValueError(
-            f"Unsupported concentration conversion: {from_unit} -> {to_unit}"
-        )
+        Raises:
+            KeyError: If a unit is not known.
+            ValueError: If a pair of units measures different quantities.
+        """
+        values = np.asarray(values, dtype=float)
+        from_ids = cls._unit_ids(from_units, len(values))
+        to_ids = cls._unit_ids(to_units, len(values))
+        incompatible = ~cls.COMPATIBLE[from_ids, to_ids]
+        if incompatible.any():
+            first = int(np.argmax(incompatible))
+            raise ValueError(
+                f"Incompatible units: {cls.UNITS[from_ids[first]]} vs "
+                f"{cls.UNITS[to_ids[first]]}"
+            )
+        converted = values * cls.BASE_FACTORS[from_ids] / cls.BASE_FACTORS[to_ids]
+        # Same units are returned unchanged, as in convert
+        return np.where(from_ids == to_ids, values, converted)
+
+    @classmethod
+    def _unit_ids(cls, units: str | Sequence[str], size: int) -> np.ndarray:
+        if isinstance(units, str):
+            return np.full(size, cls.unit_id(units), dtype=np.intp)
+        # Unit columns hold few distinct spellings, normalize each only once
+        ids = {unit: cls.unit_id(unit) for unit in set(units)}
+        return np.fromiter(map(ids.__getitem__, units), dtype=np.intp, count=size)
+
+
+UnitConverter._compile()
@@ -5,11 +5,14 @@ from agent.steps import (
     build_report,
     check_part_compliance,
     get_jurisdictions,
+    lookup_jurisdictions,
     parse_pdf,
+    route_after_lookup,
 )
 
 # ComplianceCheckAgent
-# 1. parse pdf file extract text from each page
+# 0. look up jurisdictions cached for the same pdf (sha256), if found skip to step 3
+# 1. open the pdf file, its pages are parsed lazily and streamed into step 2
 # 2. extract jurisdictions from each page, then deduplicate jurisdictions and substances within them
 # 3. check compliance of the part for each jurisdiction
 #   - DFS approach
@@ -20,12 +23,18 @@ from agent.steps import (
 
 workflow = StateGraph(ComplianceCheckAgentState)
 # Graph Nodes
+workflow.add_node("lookup_jurisdictions", lookup_jurisdictions)
 workflow.add_node("parse_pdf", parse_pdf)
 workflow.add_node("get_jurisdictions", get_jurisdictions)
 workflow.add_node("check_part_compliance", check_part_compliance)
 workflow.add_node("build_report", build_report)
 # Graph Edges
-workflow.add_edge(START, "parse_pdf")
+workflow.add_edge(START, "lookup_jurisdictions")
+workflow.add_conditional_edges(
+    "lookup_jurisdictions",
+    route_after_lookup,
+    ["parse_pdf", "check_part_compliance"],
+)
 workflow.add_edge("parse_pdf", "get_jurisdictions")
 workflow.add_edge("get_jurisdictions", "check_part_compliance")
 workflow.add_edge("check_part_compliance", "build_report")
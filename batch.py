@@ -0,0 +1,408 @@
+"""
+Headless batch compliance check of many part JSON files against many
+regulation PDFs.
+
+Each regulation is extracted once (and cached by PDF hash), then part files are
+streamed through a worker pool and one result JSON is written per
+(part, regulation) pair. Pairs whose result file already exists are skipped,
+so an interrupted run resumes where it stopped. Result files are named
+<part>-<path hash>__<regulation>.json, so part files with the same name in
+different directories do not overwrite each other's results.
+
+With --column-store, part files are loaded into a compact column store (see
+agent/utils/bom_store.py) and checked without building a Part per node, for
+very large BOMs.
+
+With --previous, part files that are revisions of already checked parts are
+re-checked against the result files in that directory, matched by part id and
+regulation (see is_result_of): the jurisdictions of the previous check are reused and only the changed sub-assemblies and their
+ancestors are evaluated again (see recheck_revision). Pairs without a previous
+result are checked in full.
+
+With --recheck, stored result files are re-checked against amended regulations
+instead: only the parts affected by the changed substance tolerances are
+evaluated again, and the parts whose compliance status flipped are listed.
+Each result is re-checked against the regulation it was checked against,
+matched by PDF file name (an amended PDF keeps the name of the one it
+replaces) or by document hash.
+
+Usage:
+    python batch.py --parts "data/parts/*.json" --regulations data/documents/RoHS.pdf
+    python batch.py --parts huge-assembly.json --regulations RoHS.pdf --column-store
+    python batch.py --parts "revised/*.json" --regulations RoHS.pdf --previous results/v1 --output results/v2
+    python batch.py --recheck "data/results/batch/*.json" --regulations amended/RoHS.pdf
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Iterator
+
+from agent.models import ComplianceCheckAgentState, ComplianceFlip
+from agent.operations import store_compliance_check
+from agent.steps import (
+    build_report,
+    check_part_compliance,
+    get_jurisdictions,
+    lookup_jurisdictions,
+    parse_pdf,
+    recheck_regulation_change,
+    recheck_revision,
+    route_after_lookup,
+)
+from agent.utils.bom_store import BOMStore
+from schema import Jurisdiction, Part
+
+
+def extract_regulation(
+    pdf_path: str, max_concurrency: int
+) -> tuple[str, list[Jurisdiction]]:
+    """Run the extraction steps of the workflow once for a regulation PDF."""
+    # The extraction steps never look at the part
+    state = ComplianceCheckAgentState(
+        report_name=pdf_path,
+        part=Part(id="", name=""),
+        file_path=pdf_path,
+        max_concurrency=max_concurrency,
+    )
+    state = lookup_jurisdictions(state)
+    if route_after_lookup(state) == "parse_pdf":
+        state = get_jurisdictions(parse_pdf(state))
+    return state.document_hash, state.jurisdictions
+
+
+def part_key(part_path: str) -> str:
+    """
+    Name the results of a part file by its name and a hash of its absolute path,
+    part files with the same name in different directories are different parts.
+    """
+    part_name = os.path.splitext(os.path.basename(part_path))[0]
+    path_hash = hashlib.sha256(os.path.abspath(part_path).encode("utf-8"))
+    return f"{part_name}-{path_hash.hexdigest()[:8]}"
+
+
+def result_path(output_dir: str, part_key: str, pdf_path: str) -> str:
+    regulation_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(output_dir, f"{part_key}__{regulation_name}.json")
+
+
+# Result files of previous checks by part id: (path, regulation PDF, document hash)
+PreviousResults = dict[str, list[tuple[str, str, str | None]]]
+
+
+def index_results(paths: Iterator[str]) -> PreviousResults:
+    """Index result files by the id of their part, for `check_part`."""
+    index: PreviousResults = {}
+    for path in paths:
+        state = load_result(path)
+        index.setdefault(state.part.id, []).append(
+            (path, state.file_path, state.document_hash)
+        )
+    return index
+
+
+def check_part(
+    part_path: str,
+    regulations: list[tuple[str, str, list[Jurisdiction]]],
+    output_dir: str,
+    max_concurrency: int,
+    column_store: bool = False,
+    previous: PreviousResults | None = None,
+) -> tuple[int, int]:
+    """
+    Check one part file against every regulation whose result is missing. With
+    `previous` results (see `index_results`), pairs with exactly one previous
+    result of the same part id and regulation are re-checked as a revision of
+    that result (see `recheck_revision`).
+
+    Returns:
+        tuple[int, int]: The number of pairs checked and skipped.
+    """
+    key = part_key(part_path)
+    pending = [
+        regulation
+        for regulation in regulations
+        if not os.path.exists(result_path(output_dir, key, regulation[0]))
+    ]
+    if not pending:
+        return 0, len(regulations)
+    if column_store:
+        check_store(part_path, key, pending, output_dir, max_concurrency)
+        return len(pending), len(regulations) - len(pending)
+
+    with open(part_path, "rb") as f:
+        part = Part.model_validate_json(f.read())
+
+    previous_results = previous.get(part.id, []) if previous else []
+    for regulation in pending:
+        pdf_path, document_hash, jurisdictions = regulation
+        previous_paths = [
+            path
+            for path, file_path, previous_hash in previous_results
+            if is_result_of(file_path, previous_hash, regulation)
+        ]
+        # Several previous results of the same part are ambiguous, check in full
+        if len(previous_paths) == 1:
+            state = recheck_revision(load_result(previous_paths[0]), part)
+            write_result(result_path(output_dir, key, pdf_path), state)
+            continue
+        state = ComplianceCheckAgentState(
+            report_name=f"Compliance Report for {part.name}",
+            part=part,
+            file_path=pdf_path,
+            document_hash=document_hash,
+            jurisdictions=jurisdictions,
+            max_concurrency=max_concurrency,
+        )
+        state = build_report(check_part_compliance(state))
+        write_result(result_path(output_dir, key, pdf_path), state)
+
+    return len(pending), len(regulations) - len(pending)
+
+
+def check_store(
+    part_path: str,
+    key: str,
+    regulations: list[tuple[str, str, list[Jurisdiction]]],
+    output_dir: str,
+    max_concurrency: int,
+):
+    """
+    Check one part file against the given regulations through a `BOMStore`.
+    The jurisdictions of all regulations share one executor, and the nested
+    `Part` is never built: the states hold the root part without its BOM and
+    the result files get the part written from the store.
+    """
+    store = BOMStore.from_file(part_path)
+    jurisdictions = [
+        jurisdiction
+        for _, _, regulation_jurisdictions in regulations
+        for jurisdiction in regulation_jurisdictions
+    ]
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        results = store_compliance_check(store, jurisdictions, executor)
+
+    part = store.part(0)
+    for pdf_path, document_hash, regulation_jurisdictions in regulations:
+        state = ComplianceCheckAgentState(
+            report_name=f"Compliance Report for {part.name}",
+            part=part,
+            file_path=pdf_path,
+            document_hash=document_hash,
+            jurisdictions=regulation_jurisdictions,
+            jurisdiction_compliance_results=results[: len(regulation_jurisdictions)],
+            max_concurrency=max_concurrency,
+        )
+        results = results[len(regulation_jurisdictions) :]
+        state = build_report(state)
+        write_result(result_path(output_dir, key, pdf_path), state, store)
+
+
+def write_result(
+    path: str, state: ComplianceCheckAgentState, store: BOMStore | None = None
+):
+    """
+    Write a result file. With a `store`, the part of the state is written from
+    the store instead (see `BOMStore.write_json`).
+    """
+    # Write atomically, a result file on disk always marks a finished pair
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        if store is None:
+            f.write(state.model_dump_json(indent=2))
+        else:
+            fields = state.model_dump(mode="json", exclude={"part"})
+            f.write("{")
+            for position, name in enumerate(ComplianceCheckAgentState.model_fields):
+                f.write(f"{', ' if position else ''}{json.dumps(name)}: ")
+                if name == "part":
+                    store.write_json(f)
+                else:
+                    f.write(json.dumps(fields[name], ensure_ascii=False))
+            f.write("}")
+    os.replace(f"{path}.tmp", path)
+
+
+def load_result(path: str) -> ComplianceCheckAgentState:
+    with open(path, encoding="utf-8") as f:
+        return ComplianceCheckAgentState.model_validate_json(f.read())
+
+
+def is_result_of(
+    file_path: str,
+    document_hash: str | None,
+    regulation: tuple[str, str, list[Jurisdiction]],
+) -> bool:
+    """
+    True if a stored result, checked against the PDF at `file_path` with
+    `document_hash`, was checked against (a version of) `regulation`.
+    """
+    pdf_path, regulation_hash, _ = regulation
+    return os.path.basename(file_path) == os.path.basename(pdf_path) or (
+        document_hash is not None and document_hash == regulation_hash
+    )
+
+
+def recheck_results(
+    results: list[tuple[str, ComplianceCheckAgentState]],
+    regulation: tuple[str, str, list[Jurisdiction]],
+    output_dir: str,
+    max_concurrency: int,
+) -> list[ComplianceFlip]:
+    """
+    Re-check stored results of a regulation (see `is_result_of`) against its
+    amended version, writing one result file per part for the new regulation.
+
+    Returns:
+        list[ComplianceFlip]: The parts whose compliance status changed.
+    """
+    pdf_path, document_hash, jurisdictions = regulation
+    rechecked, flips = recheck_regulation_change(
+        [state for _, state in results], jurisdictions, max_concurrency
+    )
+    for (path, _), state in zip(results, rechecked):
+        state.file_path = pdf_path
+        state.document_hash = document_hash
+        # Result files are named <part key>__<regulation>.json
+        key = os.path.basename(path).split("__")[0]
+        write_result(result_path(output_dir, key, pdf_path), state)
+    return flips
+
+
+def iter_part_files(patterns: list[str]) -> Iterator[str]:
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.json")
+        yield from sorted(glob.iglob(pattern))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--parts", nargs="+", help="Part JSON files, globs or dirs")
+    inputs.add_argument(
+        "--recheck",
+        nargs="+",
+        help="Result JSON files, globs or dirs to re-check against the regulations",
+    )
+    parser.add_argument(
+        "--regulations", nargs="+", required=True, help="Regulation PDF files"
+    )
+    parser.add_argument("--output", default=os.path.join("data", "results", "batch"))
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Part files checked at once"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=4,
+        help="LLM requests in flight per part file",
+    )
+    parser.add_argument(
+        "--column-store",
+        action="store_true",
+        help="Check part files through a column store instead of nested parts",
+    )
+    parser.add_argument(
+        "--previous",
+        help="Directory of the result files of the previous revisions of the parts",
+    )
+    args = parser.parse_args()
+    if args.previous and not args.parts:
+        parser.error("--previous requires --parts")
+    if args.previous and args.column_store:
+        parser.error("--previous cannot be combined with --column-store")
+    os.makedirs(args.output, exist_ok=True)
+
+    start = time.perf_counter()
+    regulations = []
+    for pdf_path in args.regulations:
+        document_hash, jurisdictions = extract_regulation(
+            pdf_path, args.max_concurrency
+        )
+        regulations.append((pdf_path, document_hash, jurisdictions))
+    extraction_time = time.perf_counter() - start
+
+    if args.recheck:
+        results = [(path, load_result(path)) for path in iter_part_files(args.recheck)]
+        matched = set()
+        for regulation in regulations:
+            regulation_results = [
+                (path, state)
+                for path, state in results
+                if is_result_of(state.file_path, state.document_hash, regulation)
+            ]
+            matched.update(path for path, _ in regulation_results)
+            flips = recheck_results(
+                regulation_results, regulation, args.output, args.max_concurrency
+            )
+            for flip in flips:
+                print(
+                    f"🔁 {flip.report_name}: {flip.part_name} ({flip.part_id}) in "
+                    f"{flip.jurisdiction_name}: {flip.was_compliant} -> {flip.is_compliant}"
+                )
+            print(
+                f"{regulation[0]}: {len(regulation_results)} results re-checked, "
+                f"{len(flips)} flips"
+            )
+        for path, _ in results:
+            if path not in matched:
+                print(f"⚠️ {path}: no matching regulation, skipped")
+        print(f"Elapsed: {time.perf_counter() - start:.1f}s")
+        return
+
+    previous = (
+        index_results(iter_part_files([args.previous])) if args.previous else None
+    )
+    checked = skipped = failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        running: dict[Future, str] = {}
+
+        def collect(done):
+            nonlocal checked, skipped, failed
+            for future in done:
+                part_path = running.pop(future)
+                try:
+                    part_checked, part_skipped = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"❌ {part_path}: {str(e).splitlines()[0]}")
+                    continue
+                checked += part_checked
+                skipped += part_skipped
+                print(f"📄 {part_path}: {part_checked} checked, {part_skipped} skipped")
+
+        # Keep a bounded number of part files in flight instead of queueing all
+        for part_path in iter_part_files(args.parts):
+            if len(running) >= 2 * args.workers:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                collect(done)
+            future = executor.submit(
+                check_part,
+                part_path,
+                regulations,
+                args.output,
+                args.max_concurrency,
+                args.column_store,
+                previous,
+            )
+            running[future] = part_path
+        collect(wait(running).done)
+
+    elapsed = time.perf_counter() - start
+    check_time = elapsed - extraction_time
+    print()
+    print(f"Regulations extracted: {len(regulations)} in {extraction_time:.1f}s")
+    print(f"Pairs checked:         {checked}")
+    print(f"Pairs skipped:         {skipped} (already done)")
+    print(f"Part files failed:     {failed}")
+    print(f"Elapsed:               {elapsed:.1f}s")
+    if checked and check_time > 0:
+        print(f"Throughput:            {checked / check_time:.2f} pairs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+benchmarks/bench_allocations.py
+
+Measures the memory allocated per mapping by check_compliance against the
+in-place implementation it replaced (copied below), which overwrote the part
+substance during unit normalization and so needed a defensive copy of every
+mapping. Reports the peak traced memory and the blocks still allocated once
+the results are built, per mapping.
+
+Usage:
+    python -m benchmarks.bench_allocations --mappings 100000
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import random
+import sys
+import time
+import tracemalloc
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+import benchmarks.fake_llm  # noqa: F401
+
+from agent.models import SubstanceMapping
+from agent.operations import check_compliance, check_compliance_many, ops
+from agent.utils.compliance_utils import make_compliant, make_violation
+from agent.utils.unit_converter import UnitConverter
+from benchmarks.bench_vectorized import make_jurisdiction_substances, make_mappings
+
+
+def legacy_check_compliance(mappings: list[SubstanceMapping]):
+    # The check before SubstanceCheck records, normalizing part substances in place
+    violations, compliant_substances = [], []
+    for mapping in mappings:
+        print(mapping)
+        part_substance = mapping.part_substance
+        jurisidiction_substance = mapping.jurisidiction_substance
+        if jurisidiction_substance is None:
+            compliant_substances.append(
+                make_compliant(
+                    part_substance,
+                    None,
+                    True,
+                    note=f"No regulation for {part_substance.name} was found in the given jurisdiction",
+                )
+            )
+            continue
+        if not mapping.is_comparable:
+            compliant_substances.append(
+                make_compliant(
+                    part_substance,
+                    jurisidiction_substance,
+                    True,
+                    note=f"The part substance ({part_substance.name}, {part_substance.value}{part_substance.unit}) and the jurisdiction substance ({jurisidiction_substance.name}, {jurisidiction_substance.value}{jurisidiction_substance.unit}) are not directly comparable. They differ in substance identity, measurement basis, or units of measure.",
+                )
+            )
+            continue
+        part_substance.value = UnitConverter.convert(
+            part_substance.value, part_substance.unit, jurisidiction_substance.unit
+        )
+        part_substance.unit = jurisidiction_substance.unit
+        tolerance_condition = jurisidiction_substance.tolerance_condition
+        check = ops.get(tolerance_condition) if tolerance_condition else None
+        if check is None:
+            compliant_substances.append(
+                make_compliant(
+                    part_substance,
+                    jurisidiction_substance,
+                    ambiguous=True,
+                    note=f"{jurisidiction_substance.name} does not have any specified tolerance in the given jurisdiction",
+                )
+            )
+        elif check(part_substance.value, jurisidiction_substance.value):
+            if tolerance_condition == "gte":
+                reason = f"Substance {part_substance.name} does not meet minimum requirements of the jurisdiction"
+            else:
+                reason = f"Substance {part_substance.name} exceeds permisible limits of the jurisdiction"
+            violations.append(
+                make_violation(part_substance, jurisidiction_substance, reason)
+            )
+        else:
+            compliant_substances.append(
+                make_compliant(
+                    part_substance,
+                    jurisidiction_substance,
+                    ambiguous=False,
+                    note=f"Substance {part_substance.name} passes the requirements of the given jurisdiction.",
+                )
+            )
+    return violations, compliant_substances
+
+
+def legacy_check(parts: list[list[SubstanceMapping]]):
+    # Shared mappings had to be copied before every in-place check
+    return [
+        legacy_check_compliance(
+            [
+                mapping.model_copy(
+                    update={"part_substance": mapping.part_substance.model_copy()}
+                )
+                for mapping in mappings
+            ]
+        )
+        for mappings in parts
+    ]
+
+
+def measure(function, parts) -> tuple[float, int, int, object]:
+    """Run `function(parts)`, returning its time, peak bytes, retained blocks and result."""
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        result = function(parts)
+        out.truncate(0)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    return elapsed, peak, sys.getallocatedblocks() - blocks, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mappings", type=int, default=100_000)
+    parser.add_argument("--per-part", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    jurisdiction = make_jurisdiction_substances(rng)
+    parts = make_mappings(args.mappings, args.per_part, jurisdiction, rng)
+    engines = {
+        "legacy (copy + in place)": legacy_check,
+        "check_compliance": lambda parts: [check_compliance(m) for m in parts],
+        "check_compliance_many": check_compliance_many,
+    }
+
+    print(f"mappings={args.mappings} per_part={args.per_part}")
+    results = []
+    for name, function in engines.items():
+        elapsed, peak, blocks, result = measure(function, parts)
+        results.append(result)
+        print(
+            f"{name:<25} {elapsed:6.2f}s  peak {peak / args.mappings:7.0f} B/mapping"
+            f"  retained {blocks / args.mappings:5.1f} blocks/mapping"
+        )
+        del result
+    print(f"identical: {all(result == results[0] for result in results)}")
+
+
+if __name__ == "__main__":
+    main()
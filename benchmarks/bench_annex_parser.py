@@ -0,0 +1,104 @@
+"""
+benchmarks/bench_annex_parser.py
+
+Comparison harness for the annex parser: every page the parser trusts is also
+extracted by the LLM, and the parsed limits are matched against the LLM's
+(by name, synonym or CAS number through a JurisdictionIndex). Reports the share
+of pages parsed locally, the agreement on value and unit, and the time per page.
+
+By default the LLM is the regex-backed fake of bench_page_filter, on the bundled
+RoHS.pdf and a synthetic annex PDF. With --live the real model is used
+(GOOGLE_API_KEY must be set). Every PDF is compared against an empty page
+cache, so every LLM call is timed.
+
+Usage:
+    python -m benchmarks.bench_annex_parser --pages 100 --prose 0.3
+    python -m benchmarks.bench_annex_parser --live --pdf data/documents/RoHS.pdf
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import fitz
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import FakeLatencyChatModel, install, temporary_caches
+from benchmarks.bench_page_filter import respond
+from benchmarks.synthetic import make_annex_pdf
+
+from agent.operations import extract_jurisdiction
+from agent.utils.annex_parser import MIN_CONFIDENCE, parse_annex
+from agent.utils.jurisdiction_index import JurisdictionIndex
+
+
+def compare(pdf_path: str) -> dict:
+    result = {"pages": 0, "parsed": 0, "limits": 0, "agreed": 0}
+    parse_time = llm_time = 0.0
+    with fitz.open(pdf_path) as document:
+        for page in document:
+            text = page.get_text()
+            result["pages"] += 1
+            start = time.perf_counter()
+            annex = parse_annex(text)
+            parse_time += time.perf_counter() - start
+            if annex.confidence < MIN_CONFIDENCE:
+                continue
+            result["parsed"] += 1
+
+            start = time.perf_counter()
+            extracted = extract_jurisdiction(text)
+            llm_time += time.perf_counter() - start
+            indexes = {
+                j.name: JurisdictionIndex(j.substance_tolerances) for j in extracted
+            }
+            for jurisdiction in annex.jurisdictions:
+                index = indexes.get(jurisdiction.name, JurisdictionIndex())
+                for substance in jurisdiction.substance_tolerances:
+                    match = index.find(substance)
+                    result["limits"] += 1
+                    result["agreed"] += match is not None and (
+                        match.value,
+                        match.unit,
+                    ) == (substance.value, substance.unit)
+    result["parse_ms"] = 1000 * parse_time / max(result["pages"], 1)
+    result["llm_ms"] = 1000 * llm_time / max(result["parsed"], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", nargs="*", default=None)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--prose", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    if not args.live:
+        install(FakeLatencyChatModel(latency=args.latency, respond=respond))
+
+    with tempfile.TemporaryDirectory() as directory:
+        pdfs = args.pdf
+        if pdfs is None:
+            synthetic = os.path.join(directory, "annex.pdf")
+            make_annex_pdf(synthetic, args.pages, prose=args.prose)
+            pdfs = [os.path.join("data", "documents", "RoHS.pdf"), synthetic]
+        results = []
+        for pdf in pdfs:
+            with temporary_caches():
+                results.append((pdf, compare(pdf)))
+
+    for pdf, result in results:
+        agreement = result["agreed"] / result["limits"] if result["limits"] else 1.0
+        print(
+            f"{os.path.basename(pdf)}: {result['parsed']}/{result['pages']} pages "
+            f"parsed locally, {agreement:.1%} of {result['limits']} limits agree "
+            f"with the LLM, {result['parse_ms']:.2f} ms/page parsed vs "
+            f"{result['llm_ms']:.0f} ms/page LLM"
+        )
+
+
+if __name__ == "__main__":
+    main()
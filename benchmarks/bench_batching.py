@@ -0,0 +1,84 @@
+"""
+benchmarks/bench_batching.py
+
+Compares one substance mapping request per part with batched mapping requests
+packed under a token budget, on a synthetic BOM against the fake LLM. Every
+part carries a substance outside the bundled dictionary, so no part is mapped
+locally by the substance resolver and every mapping needs the LLM.
+
+Usage:
+    python -m benchmarks.bench_batching --nodes 300 --token-budget 4000
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import (
+    FakeLatencyChatModel,
+    any_mapping_response,
+    install,
+    temporary_caches,
+)
+from benchmarks.synthetic import make_bom, make_jurisdiction
+
+import agent.operations
+from agent.operations import flatten_bom, parallel_compliance_check
+from schema import Substance
+
+
+def add_unresolvable(nodes):
+    # Distinct values keep the parts from being deduplicated
+    for index, node in enumerate(nodes):
+        node.part.substances.append(
+            Substance(
+                name="Zirconium",
+                standardized_name="Zr",
+                value=float(index),
+                unit="mg/kg",
+            )
+        )
+
+
+def run(nodes, jurisdiction, concurrency, token_budget):
+    llm = agent.operations.llm
+    calls = llm.calls
+    start = time.perf_counter()
+    # Use an empty cache so both modes pay for every mapping
+    with temporary_caches(), ThreadPoolExecutor(max_workers=concurrency) as executor:
+        [result] = parallel_compliance_check(
+            nodes, [jurisdiction], executor, token_budget
+        )
+    return time.perf_counter() - start, llm.calls - calls, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--token-budget", type=int, default=4000)
+    args = parser.parse_args()
+
+    install(FakeLatencyChatModel(latency=args.latency, respond=any_mapping_response))
+    nodes = flatten_bom(make_bom(args.nodes))
+    add_unresolvable(nodes)
+    jurisdiction = make_jurisdiction()
+
+    single_time, single_calls, single = run(nodes, jurisdiction, args.concurrency, None)
+    batched_time, batched_calls, batched = run(
+        nodes, jurisdiction, args.concurrency, args.token_budget
+    )
+
+    print(f"nodes={args.nodes} latency={args.latency}s")
+    print(f"per part: {single_time:.2f}s, {single_calls} LLM calls")
+    print(
+        f"batched:  {batched_time:.2f}s, {batched_calls} LLM calls "
+        f"(token_budget={args.token_budget})"
+    )
+    print(f"identical: {single == batched}")
+
+
+if __name__ == "__main__":
+    main()
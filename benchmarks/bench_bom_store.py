@@ -0,0 +1,137 @@
+"""
+benchmarks/bench_bom_store.py
+
+Compares loading a large BOM JSON with Part.model_validate_json against
+BOMStore.from_json, each in a fresh interpreter: load time, RSS growth, and
+the traced memory held by the loaded BOM and at the peak of the load (the
+parsed JSON objects, before they are discarded). Also checks that
+store_compliance_check produces the same result tree from the store as
+parallel_compliance_check from the Part, against the fake LLM.
+
+Usage:
+    python -m benchmarks.bench_bom_store --nodes 100000
+"""
+
+import argparse
+import gc
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import make_bom, make_jurisdiction
+
+from agent.utils.bom_store import BOMStore
+from schema import Part
+
+LOADERS = {
+    "Part.model_validate_json": Part.model_validate_json,
+    "BOMStore.from_json": BOMStore.from_json,
+}
+
+
+def rss_mb() -> float:
+    """The current RSS of the process (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def load(loader: str, path: str):
+    """
+    Child process: load the file and print the load time, the RSS growth, and
+    the traced memory held by the loaded BOM and at the peak of the load.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    baseline = rss_mb()
+    start = time.perf_counter()
+    loaded = LOADERS[loader](data)
+    elapsed = time.perf_counter() - start
+    rss = rss_mb() - baseline
+
+    # Load again under tracemalloc, which slows loading down
+    del loaded
+    gc.collect()
+    tracemalloc.start()
+    loaded = LOADERS[loader](data)
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{elapsed} {rss} {held / 2**20} {peak / 2**20}")
+    return loaded
+
+
+def measure(loader: str, path: str) -> list[float]:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_bom_store", "--load", loader, path],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+def same_result_trees(nodes: int) -> bool:
+    # Imported here, so the loading processes only import the loaders. fake_llm
+    # sets a dummy API key, so it must be imported before agent.operations
+    from benchmarks.fake_llm import (
+        FakeLatencyChatModel,
+        any_mapping_response,
+        install,
+        temporary_caches,
+    )
+
+    from agent.operations import (
+        flatten_bom,
+        parallel_compliance_check,
+        store_compliance_check,
+    )
+
+    install(FakeLatencyChatModel(latency=0.0, respond=any_mapping_response))
+    part = make_bom(nodes)
+    jurisdictions = [make_jurisdiction("European Union", "EU")]
+    store = BOMStore.from_json(part.model_dump_json())
+    # An empty cache per run, so the store is not checked from the Part's mappings
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        with temporary_caches():
+            from_part = parallel_compliance_check(
+                flatten_bom(part), jurisdictions, executor
+            )
+        with temporary_caches():
+            from_store = store_compliance_check(store, jurisdictions, executor)
+    return from_part == from_store
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--check-nodes", type=int, default=2_000)
+    parser.add_argument("--load", nargs=2, metavar=("LOADER", "FILE"))
+    args = parser.parse_args()
+    if args.load:
+        load(*args.load)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bom.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_bom(args.nodes).model_dump_json())
+        size = os.path.getsize(path) / 2**20
+        print(f"nodes={args.nodes} file={size:.1f}MiB")
+        for loader in LOADERS:
+            elapsed, rss, held, peak = measure(loader, path)
+            print(
+                f"{loader:<25} {elapsed:6.2f}s  RSS +{rss:.1f}MiB"
+                f"  held {held:.1f}MiB  peak {peak:.1f}MiB"
+            )
+
+    print(f"same result tree ({args.check_nodes} nodes): ", end="")
+    print(same_result_trees(args.check_nodes))
+
+
+if __name__ == "__main__":
+    main()
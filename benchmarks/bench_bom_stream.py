@@ -0,0 +1,87 @@
+"""
+benchmarks/bench_bom_stream.py
+
+Measures the load time, and the traced memory held and at the peak of loading,
+of a large synthetic part file for:
+
+- reading the file, decoding it and validating the text with
+  Part.model_validate_json, what utils.run_agent used to do,
+- reading the file and validating the bytes with Part.model_validate_json,
+  what utils.run_agent and batch.py do,
+- BOMStore.from_file, which parses the file incrementally with the ijson
+  loader of agent/utils/bom_stream.py (batch.py --column-store).
+
+Usage:
+    python -m benchmarks.bench_bom_stream --nodes 50000
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_bom
+
+from agent.utils.bom_store import BOMStore
+from schema import Part
+
+
+def read_decode_and_validate(path: str) -> Part:
+    # Raw bytes, decoded text and the model at once
+    with open(path, "rb") as f:
+        return Part.model_validate_json(f.read().decode("utf-8"))
+
+
+def read_and_validate(path: str) -> Part:
+    with open(path, "rb") as f:
+        return Part.model_validate_json(f.read())
+
+
+LOADERS = {
+    "read + decode + validate": read_decode_and_validate,
+    "read + validate": read_and_validate,
+    "BOMStore.from_file": BOMStore.from_file,
+}
+
+
+def traced(loader, path: str) -> tuple[float, float, float]:
+    """The load time, then the traced memory held and at the peak of a second load."""
+    gc.collect()
+    start = time.perf_counter()
+    loaded = loader(path)
+    elapsed = time.perf_counter() - start
+    del loaded
+
+    # Load again under tracemalloc, which slows loading down
+    gc.collect()
+    tracemalloc.start()
+    loaded = loader(path)
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loaded
+    return elapsed, held / 2**20, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bom.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_bom(args.nodes).model_dump_json())
+        size = os.path.getsize(path) / 2**20
+        print(f"nodes={args.nodes} file={size:.1f}MiB")
+        for name, loader in LOADERS.items():
+            elapsed, held, peak = traced(loader, path)
+            print(
+                f"{name:<25} {elapsed:6.2f}s  held {held:6.1f}MiB  peak {peak:6.1f}MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
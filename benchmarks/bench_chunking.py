@@ -0,0 +1,75 @@
+"""
+benchmarks/bench_chunking.py
+
+Compares one extraction prompt per page with token budgeted page chunks on a
+synthetic regulation PDF with short pages, reporting the number of LLM calls,
+the time against the fake LLM and whether the merged jurisdictions match.
+
+Usage:
+    python -m benchmarks.bench_chunking --pages 300 --budget 2000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import FakeLatencyChatModel, install, temporary_caches
+from benchmarks.bench_page_filter import respond
+from benchmarks.synthetic import make_pdf
+
+import agent.operations
+from agent.models import ComplianceCheckAgentState
+from agent.steps import get_jurisdictions, parse_pdf
+from schema import Part
+
+
+def run(pdf_path: str, token_budget: int | None) -> tuple[float, int, str]:
+    state = ComplianceCheckAgentState(
+        report_name="benchmark",
+        part=Part(id="P", name="P"),
+        file_path=pdf_path,
+        extraction_token_budget=token_budget,
+        lean_state=True,
+    )
+    # An empty cache per run, and the calls the fake model actually receives
+    with temporary_caches():
+        calls = agent.operations.llm.calls
+        start = time.perf_counter()
+        state = get_jurisdictions(parse_pdf(state))
+        elapsed = time.perf_counter() - start
+        calls = agent.operations.llm.calls - calls
+    merged = json.dumps(
+        sorted(
+            (j.name, s.name, s.value, s.unit)
+            for j in state.jurisdictions
+            for s in j.substance_tolerances
+        )
+    )
+    return elapsed, calls, merged
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--lines", type=int, default=6)
+    parser.add_argument("--budget", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    install(FakeLatencyChatModel(latency=args.latency, respond=respond))
+    with tempfile.TemporaryDirectory() as directory:
+        pdf = make_pdf(os.path.join(directory, "a.pdf"), args.pages, 0, args.lines)
+        paged_time, paged_calls, paged_result = run(pdf, None)
+        chunked_time, chunked_calls, chunked_result = run(pdf, args.budget)
+
+    print(f"pages={args.pages} budget={args.budget} latency={args.latency}s")
+    print(f"one page per prompt: {paged_calls} calls, {paged_time:.2f}s")
+    print(f"chunked:             {chunked_calls} calls, {chunked_time:.2f}s")
+    print(f"identical:           {paged_result == chunked_result}")
+
+
+if __name__ == "__main__":
+    main()
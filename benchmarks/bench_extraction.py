@@ -0,0 +1,89 @@
+"""
+benchmarks/bench_extraction.py
+
+Compares serial and concurrent per-page jurisdiction extraction against the
+fake LLM and checks that both produce the same merged jurisdictions. Each run
+starts from an empty page cache, so neither is answered from the other's pages.
+
+Usage:
+    python -m benchmarks.bench_extraction --pages 100 --latency 0.2
+"""
+
+import argparse
+import json
+import re
+import time
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import FakeLatencyChatModel, install, temporary_caches
+from langchain_core.documents import Document
+
+from agent.models import ComplianceCheckAgentState
+from agent.steps import get_jurisdictions
+from schema import Part
+
+SUBSTANCES = ["Lead", "Mercury", "Cadmium", "Hexavalent chromium", "PBB", "PBDE"]
+
+
+def respond(prompt: str) -> str:
+    # Each page mentions a single substance, later pages override earlier limits
+    page = int(re.search(r"PAGE-(\d+)", prompt).group(1))
+    name = SUBSTANCES[page % len(SUBSTANCES)]
+    return json.dumps(
+        {
+            "jurisdictions": [
+                {
+                    "name": "European Union",
+                    "abbreviation": "EU",
+                    "substance_tolerances": [
+                        {
+                            "name": name,
+                            "standardized_name": name,
+                            "value": page / 1000,
+                            "unit": "%",
+                            "tolerance_condition": "lte",
+                        }
+                    ],
+                }
+            ]
+        }
+    )
+
+
+def run(pages: list[Document], max_concurrency: int) -> tuple[float, str]:
+    state = ComplianceCheckAgentState(
+        report_name="benchmark",
+        part=Part(id="P", name="P"),
+        file_path="",
+        pages=pages,
+        max_concurrency=max_concurrency,
+    )
+    with temporary_caches():
+        start = time.perf_counter()
+        state = get_jurisdictions(state)
+        elapsed = time.perf_counter() - start
+    return elapsed, json.dumps([j.model_dump() for j in state.jurisdictions])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    install(FakeLatencyChatModel(latency=args.latency, respond=respond))
+    pages = [Document(page_content=f"PAGE-{i}") for i in range(args.pages)]
+
+    serial_time, serial_result = run(pages, max_concurrency=1)
+    concurrent_time, concurrent_result = run(pages, args.concurrency)
+
+    print(f"pages={args.pages} latency={args.latency}s")
+    print(f"serial:     {serial_time:.2f}s")
+    print(f"concurrent: {concurrent_time:.2f}s (max_concurrency={args.concurrency})")
+    print(f"speedup:    {serial_time / concurrent_time:.1f}x")
+    print(f"identical:  {serial_result == concurrent_result}")
+
+
+if __name__ == "__main__":
+    main()
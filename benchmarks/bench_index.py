@@ -0,0 +1,100 @@
+"""
+benchmarks/bench_index.py
+
+Microbenchmark of JurisdictionIndex against the linear scan of
+Substance.find_by_standard_name and the dict-rebuilding substance merge that
+get_jurisdictions used before the index.
+
+Usage:
+    python -m benchmarks.bench_index --substances 10000
+"""
+
+import argparse
+import random
+import time
+
+from agent.utils.jurisdiction_index import JurisdictionIndex
+from schema import Substance
+
+
+def make_substances(count: int, rng: random.Random) -> list[Substance]:
+    return [
+        Substance(
+            name=f"Substance {i}" if rng.random() < 0.5 else f"SUBSTANCE {i}",
+            standardized_name=f"S{i}",
+            value=rng.random(),
+            unit="%",
+            tolerance_condition="lte",
+        )
+        for i in range(count)
+    ]
+
+
+def rebuild_merge(pages: list[list[Substance]]) -> list[Substance]:
+    # The merge get_jurisdictions used to do, rebuilding dicts for every page
+    merged: list[Substance] = []
+    for substances in pages:
+        substances = list({s.name: s for s in substances}.values())
+        merged_substances = {s.name: s for s in merged}
+        for s in substances:
+            merged_substances[s.name] = s
+        merged = list(merged_substances.values())
+    return list({s.name.casefold(): s for s in merged}.values())
+
+
+def index_merge(pages: list[list[Substance]]) -> list[Substance]:
+    index = JurisdictionIndex()
+    for substances in pages:
+        for s in substances:
+            index.upsert(s)
+    return index.substances
+
+
+def timed(function, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--substances", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    parser.add_argument("--pages", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    substances = make_substances(args.substances, rng)
+    names = [f"S{rng.randrange(args.substances)}" for _ in range(args.lookups)]
+
+    scan_time, scanned = timed(
+        lambda: [Substance.find_by_standard_name(substances, n) for n in names]
+    )
+    index = JurisdictionIndex(substances)
+    # Lookup maps are built lazily on the first lookup
+    build_time, _ = timed(index.find_by_standard_name, "")
+    lookup_time, looked_up = timed(
+        lambda: [index.find_by_standard_name(n) for n in names]
+    )
+    print(f"substances={args.substances} lookups={args.lookups}")
+    print(f"linear scan:  {scan_time * 1000:.1f}ms")
+    print(f"index build:  {build_time * 1000:.1f}ms")
+    print(f"index lookup: {lookup_time * 1000:.1f}ms")
+    print(f"identical:    {scanned == looked_up}")
+
+    # Every page repeats a slice of the substances, as overlapping pages do
+    size = args.substances // 10
+    pages = [
+        substances[start : start + size]
+        for start in (rng.randrange(args.substances - size) for _ in range(args.pages))
+    ]
+    rebuild_time, rebuilt = timed(rebuild_merge, pages)
+    index_time, indexed = timed(index_merge, pages)
+    print(f"pages={args.pages} of {size} substances")
+    print(f"rebuild merge: {rebuild_time * 1000:.1f}ms")
+    print(f"index merge:   {index_time * 1000:.1f}ms")
+    print(f"identical:     {rebuilt == indexed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+benchmarks/bench_lean_state.py
+
+Measures the memory held by the agent state with and without lean_state on a
+synthetic regulation PDF, running parse_pdf and get_jurisdictions against the
+fake LLM.
+
+Usage:
+    python -m benchmarks.bench_lean_state --pages 500
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import FakeLatencyChatModel, install, temporary_caches
+from benchmarks.synthetic import make_pdf
+
+from agent.models import ComplianceCheckAgentState
+from agent.steps import get_jurisdictions, parse_pdf
+from schema import Part
+
+
+def respond(prompt: str) -> str:
+    return json.dumps(
+        {
+            "jurisdictions": [
+                {
+                    "name": "European Union",
+                    "abbreviation": "EU",
+                    "substance_tolerances": [
+                        {
+                            "name": "Lead",
+                            "standardized_name": "Pb",
+                            "value": 0.1,
+                            "unit": "%",
+                            "tolerance_condition": "lte",
+                        }
+                    ],
+                }
+            ]
+        }
+    )
+
+
+def run(pdf_path: str, lean_state: bool) -> dict:
+    state = ComplianceCheckAgentState(
+        report_name="benchmark",
+        part=Part(id="P", name="P"),
+        file_path=pdf_path,
+        lean_state=lean_state,
+        max_concurrency=8,
+    )
+    tracemalloc.start()
+    start = time.perf_counter()
+    state = get_jurisdictions(parse_pdf(state))
+    elapsed = time.perf_counter() - start
+    # Memory still held once extraction is done and only the state is left
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "time": elapsed,
+        "peak": peak,
+        "retained": retained,
+        "state_json": len(state.model_dump_json()),
+        "jurisdictions": json.dumps([j.model_dump() for j in state.jurisdictions]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    install(FakeLatencyChatModel(latency=args.latency, respond=respond))
+    with tempfile.TemporaryDirectory() as directory:
+        pdf = make_pdf(os.path.join(directory, "a.pdf"), args.pages, 0)
+        # An empty cache per run, so neither is served from the other's pages
+        with temporary_caches():
+            full = run(pdf, False)
+        with temporary_caches():
+            lean = run(pdf, True)
+
+    mb = 1024 * 1024
+    print(f"pages={args.pages}")
+    for name, result in (("full state", full), ("lean state", lean)):
+        print(
+            f"{name}: {result['time']:.2f}s, peak {result['peak'] / mb:.1f} MiB, "
+            f"retained {result['retained'] / mb:.1f} MiB, "
+            f"state JSON {result['state_json'] / mb:.2f} MiB"
+        )
+    print(f"identical:  {full['jurisdictions'] == lean['jurisdictions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+benchmarks/bench_page_filter.py
+
+Recall harness for the page relevance filter: runs get_jurisdictions with and
+without filter_pages and reports the page skip rate and the share of the
+substance limits found by the full extraction that the filtered run also finds.
+
+By default the LLM is replaced by a fake one that extracts "<name> (<value> %)"
+and "<name> shall not exceed <value> %" limits with a regex, on the bundled
+RoHS.pdf and a synthetic PDF with boilerplate pages. With --live the real model
+is used (GOOGLE_API_KEY must be set).
+
+Usage:
+    python -m benchmarks.bench_page_filter --pages 200 --boilerplate 0.5
+    python -m benchmarks.bench_page_filter --live --pdf data/documents/RoHS.pdf
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import FakeLatencyChatModel, install, temporary_caches
+from benchmarks.synthetic import make_pdf
+
+from agent.models import ComplianceCheckAgentState
+from agent.steps import get_jurisdictions, parse_pdf
+from schema import Part
+
+LIMIT = re.compile(
+    r"([A-Z][\w ()-]*?)(?:\s*\([A-Z]{2,8}\))?\s*(?:\(|shall not exceed\s*)"
+    r"(\d+(?:[.,]\d+)?)\s*%",
+)
+
+
+def respond(prompt: str) -> str:
+    # Only look at the page text, not the instructions around it
+    text = prompt.split("\nText:\n", 1)[1].split("The output should be")[0]
+    substances = {
+        name.strip(): float(value.replace(",", "."))
+        for name, value in LIMIT.findall(text)
+    }
+    jurisdictions = []
+    if substances:
+        jurisdictions.append(
+            {
+                "name": "European Union",
+                "abbreviation": "EU",
+                "substance_tolerances": [
+                    {
+                        "name": name,
+                        "standardized_name": name,
+                        "value": value,
+                        "unit": "%",
+                        "tolerance_condition": "lte",
+                    }
+                    for name, value in substances.items()
+                ],
+            }
+        )
+    return json.dumps({"jurisdictions": jurisdictions})
+
+
+def extract(pdf_path: str, filter_pages: bool) -> tuple[set, dict]:
+    state = ComplianceCheckAgentState(
+        report_name="benchmark",
+        part=Part(id="P", name="P"),
+        file_path=pdf_path,
+        filter_pages=filter_pages,
+        lean_state=True,
+    )
+    # An empty cache per run, so the full extraction does not reuse the pages
+    # of the filtered one
+    with temporary_caches():
+        state = get_jurisdictions(parse_pdf(state))
+    found = {
+        (jurisdiction.name, substance.name.casefold(), substance.value, substance.unit)
+        for jurisdiction in state.jurisdictions
+        for substance in jurisdiction.substance_tolerances
+    }
+    return found, state.run_stats.get("page_filter", {})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", nargs="*", default=None)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--boilerplate", type=float, default=0.5)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    if not args.live:
+        install(FakeLatencyChatModel(latency=0.0, respond=respond))
+
+    with tempfile.TemporaryDirectory() as directory:
+        pdfs = args.pdf
+        if pdfs is None:
+            synthetic = os.path.join(directory, "synthetic.pdf")
+            make_pdf(synthetic, args.pages, boilerplate=args.boilerplate)
+            pdfs = [os.path.join("data", "documents", "RoHS.pdf"), synthetic]
+
+        results = []
+        for pdf in pdfs:
+            filtered, stats = extract(pdf, filter_pages=True)
+            full, _ = extract(pdf, filter_pages=False)
+            recall = len(filtered & full) / len(full) if full else 1.0
+            results.append((pdf, stats, recall, len(full)))
+
+    for pdf, stats, recall, substances in results:
+        print(
+            f"{os.path.basename(pdf)}: {stats['skipped']}/{stats['pages']} pages "
+            f"skipped ({stats['skip_rate']:.0%}), recall {recall:.1%} "
+            f"of {substances} limits"
+        )
+
+
+if __name__ == "__main__":
+    main()
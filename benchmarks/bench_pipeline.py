@@ -0,0 +1,88 @@
+"""
+benchmarks/bench_pipeline.py
+
+Compares loading every page of a synthetic regulation PDF before extraction
+(PyMuPDFLoader.load followed by executor.map) with the streaming pipeline of
+parse_pdf and get_jurisdictions, reporting the time to the first extracted
+jurisdiction and the total time against the fake LLM.
+
+Usage:
+    python -m benchmarks.bench_pipeline --pages 500 --latency 0.05
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import FakeLatencyChatModel, install, temporary_caches
+from benchmarks.bench_lean_state import respond
+from benchmarks.synthetic import make_pdf
+from langchain_community.document_loaders import PyMuPDFLoader
+
+from agent.models import ComplianceCheckAgentState
+from agent.operations import extract_jurisdiction
+from agent.steps import get_jurisdictions, parse_pdf
+from schema import Part
+
+
+def run_materialized(pdf_path: str, max_concurrency: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    pages = PyMuPDFLoader(pdf_path).load()
+    first = None
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for result in executor.map(
+            extract_jurisdiction, (page.page_content for page in pages)
+        ):
+            if first is None and result:
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def run_pipelined(pdf_path: str, max_concurrency: int) -> tuple[float, float]:
+    state = ComplianceCheckAgentState(
+        report_name="benchmark",
+        part=Part(id="P", name="P"),
+        file_path=pdf_path,
+        max_concurrency=max_concurrency,
+    )
+    start = time.perf_counter()
+    state = get_jurisdictions(parse_pdf(state))
+    elapsed = time.perf_counter() - start
+    first = state.run_stats["page_extraction"]["time_to_first_jurisdiction"]
+    return first, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    install(FakeLatencyChatModel(latency=args.latency, respond=respond))
+    with tempfile.TemporaryDirectory() as directory:
+        pdf = make_pdf(os.path.join(directory, "a.pdf"), args.pages, 0)
+        # An empty cache per run, so neither is served from the other's pages
+        with temporary_caches():
+            materialized_first, materialized_time = run_materialized(
+                pdf, args.concurrency
+            )
+        with temporary_caches():
+            pipelined_first, pipelined_time = run_pipelined(pdf, args.concurrency)
+
+    print(f"pages={args.pages} latency={args.latency}s concurrency={args.concurrency}")
+    print(
+        f"load then extract: first jurisdiction {materialized_first:.3f}s, "
+        f"total {materialized_time:.2f}s"
+    )
+    print(
+        f"pipelined:         first jurisdiction {pipelined_first:.3f}s, "
+        f"total {pipelined_time:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
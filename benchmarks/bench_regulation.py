@@ -0,0 +1,140 @@
+"""
+benchmarks/bench_regulation.py
+
+Compares a full re-check of a portfolio of checked BOMs against an amended
+jurisdiction with revise_regulation_check, which only evaluates the parts
+affected by the change, on synthetic BOMs against the fake LLM. Every fourth
+part carries a substance outside the bundled dictionary, so its mapping needs
+the LLM. Two amendments are measured: a tightened lead limit and an added
+phthalate (as in Directive 2015/863).
+
+The revision runs with the mapping cache of the first check. The full re-check
+runs with an empty cache, which is what it gets in practice: the cache key of
+every mapping includes the jurisdiction's substance list, which changed.
+
+Usage:
+    python -m benchmarks.bench_regulation --boms 20 --nodes 300
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import (
+    FakeLatencyChatModel,
+    any_mapping_response,
+    install,
+    temporary_caches,
+)
+from benchmarks.synthetic import make_bom, make_jurisdiction
+
+import agent.operations
+from agent.operations import (
+    CheckedBOM,
+    flatten_bom,
+    parallel_compliance_check,
+    revise_regulation_check,
+)
+from agent.utils.part_mass import part_masses
+from schema import Jurisdiction, Substance
+
+
+def make_portfolio(boms: int, nodes: int) -> list[CheckedBOM]:
+    portfolio = []
+    for seed in range(boms):
+        bom = flatten_bom(make_bom(nodes, seed=seed))
+        for index, node in enumerate(bom[::4]):
+            node.part.substances.append(
+                Substance(
+                    name="Zirconium",
+                    standardized_name="Zr",
+                    value=float(seed * nodes + index),
+                    unit="mg/kg",
+                )
+            )
+        masses = part_masses([node.part for node in bom])
+        portfolio.append(CheckedBOM(bom, [], [], masses))
+    return portfolio
+
+
+def amend(jurisdiction: Jurisdiction, amendment: str) -> Jurisdiction:
+    substances = list(jurisdiction.substance_tolerances)
+    if amendment == "tighten":
+        substances = [
+            s.model_copy(update={"value": 0.05}) if s.standardized_name == "Pb" else s
+            for s in substances
+        ]
+    else:
+        substances.append(
+            Substance(
+                name="Bis(2-ethylhexyl) phthalate",
+                standardized_name="DEHP",
+                value=0.1,
+                unit="%",
+                tolerance_condition="lte",
+            )
+        )
+    return jurisdiction.model_copy(update={"substance_tolerances": substances})
+
+
+def check_all(portfolio, jurisdictions, executor):
+    return [
+        parallel_compliance_check(
+            checked.nodes, jurisdictions, executor, masses=checked.masses
+        )
+        for checked in portfolio
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boms", type=int, default=20)
+    parser.add_argument("--nodes", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    install(FakeLatencyChatModel(latency=args.latency, respond=any_mapping_response))
+    llm = agent.operations.llm
+    jurisdiction = make_jurisdiction()
+    portfolio = make_portfolio(args.boms, args.nodes)
+
+    print(f"boms={args.boms} nodes={args.nodes} latency={args.latency}s")
+    with temporary_caches(), ThreadPoolExecutor(
+        max_workers=args.concurrency
+    ) as executor:
+        start = time.perf_counter()
+        portfolio = [
+            checked._replace(jurisdictions=[jurisdiction], results=results)
+            for checked, results in zip(
+                portfolio, check_all(portfolio, [jurisdiction], executor)
+            )
+        ]
+        print(f"first check: {time.perf_counter() - start:.2f}s")
+
+        for amendment in ("tighten", "add"):
+            amended = [amend(jurisdiction, amendment)]
+
+            calls = llm.calls
+            start = time.perf_counter()
+            revised, stats = revise_regulation_check(portfolio, amended, executor)
+            revision_time = time.perf_counter() - start
+            revision_calls = llm.calls - calls
+
+            with temporary_caches():
+                calls = llm.calls
+                start = time.perf_counter()
+                full = check_all(portfolio, amended, executor)
+                full_time = time.perf_counter() - start
+            full_calls = llm.calls - calls
+
+            print(f"{amendment}:")
+            print(f"  full re-check:  {full_time:.2f}s, {full_calls} LLM calls")
+            print(f"  revision:       {revision_time:.2f}s, {revision_calls} LLM calls")
+            print(f"  revision stats: {stats}")
+            print(f"  identical:      {revised == full}")
+
+
+if __name__ == "__main__":
+    main()
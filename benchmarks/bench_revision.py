@@ -0,0 +1,108 @@
+"""
+benchmarks/bench_revision.py
+
+Compares a full re-check of a revised BOM with revise_compliance_check, which
+splices the results of unchanged sub-assemblies in from the previous check,
+on a synthetic BOM against the fake LLM. The revision changes the substances
+of a few random parts. The full re-check runs with the mapping cache of the
+first check, as a re-run of the workflow would.
+
+Usage:
+    python -m benchmarks.bench_revision --nodes 5000 --changes 3
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import (
+    FakeLatencyChatModel,
+    any_mapping_response,
+    install,
+    temporary_caches,
+)
+from benchmarks.synthetic import make_bom, make_jurisdiction, make_substance
+
+import agent.operations
+from agent.operations import (
+    flatten_bom,
+    parallel_compliance_check,
+    revise_compliance_check,
+)
+from agent.utils.part_mass import part_masses
+
+
+def masses_of(nodes):
+    return part_masses([node.part for node in nodes])
+
+
+def revise(part, changes: int, seed: int = 0):
+    """A deep copy of the part with new substances in `changes` random parts."""
+    rng = random.Random(seed)
+    revised = part.model_copy(deep=True)
+    nodes = flatten_bom(revised)
+    for node in rng.sample(nodes, changes):
+        node.part.substances = node.part.substances + [make_substance(rng)]
+    return revised
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=5_000)
+    parser.add_argument("--changes", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    install(FakeLatencyChatModel(latency=args.latency, respond=any_mapping_response))
+    llm = agent.operations.llm
+    jurisdictions = [make_jurisdiction(), make_jurisdiction("China", "CN")]
+
+    part = make_bom(args.nodes)
+    previous_nodes = flatten_bom(part)
+    previous_masses = masses_of(previous_nodes)
+    nodes = flatten_bom(revise(part, args.changes))
+    masses = masses_of(nodes)
+
+    # Start from an empty cache, the first check pays for every mapping
+    with temporary_caches(), ThreadPoolExecutor(
+        max_workers=args.concurrency
+    ) as executor:
+        start = time.perf_counter()
+        previous = parallel_compliance_check(
+            previous_nodes, jurisdictions, executor, masses=previous_masses
+        )
+        first_time = time.perf_counter() - start
+
+        calls = llm.calls
+        start = time.perf_counter()
+        revised, stats = revise_compliance_check(
+            previous_nodes,
+            previous,
+            nodes,
+            jurisdictions,
+            executor,
+            masses=masses,
+            previous_masses=previous_masses,
+        )
+        revision_time = time.perf_counter() - start
+        revision_calls = llm.calls - calls
+
+        calls = llm.calls
+        start = time.perf_counter()
+        full = parallel_compliance_check(nodes, jurisdictions, executor, masses=masses)
+        full_time = time.perf_counter() - start
+        full_calls = llm.calls - calls
+
+    print(f"nodes={args.nodes} changes={args.changes} latency={args.latency}s")
+    print(f"first check:      {first_time:.2f}s")
+    print(f"full re-check:    {full_time:.2f}s, {full_calls} LLM calls")
+    print(f"revision check:   {revision_time:.2f}s, {revision_calls} LLM calls")
+    print(f"revision stats:   {stats}")
+    print(f"identical:        {revised == full}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+benchmarks/bench_traversal.py
+
+Compares the serial dfs_part_traversal with the concurrent
+parallel_compliance_check on a synthetic BOM against the fake LLM, then
+compares checking several jurisdictions one after another with the
+shared-executor fan-out of parallel_compliance_check.
+
+Usage:
+    python -m benchmarks.bench_traversal --nodes 500 --latency 0.05
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+from benchmarks.fake_llm import (
+    FakeLatencyChatModel,
+    install,
+    mapping_response,
+    temporary_caches,
+)
+from benchmarks.synthetic import make_bom, make_jurisdiction
+
+from agent.operations import (
+    dfs_part_traversal,
+    flatten_bom,
+    parallel_compliance_check,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--jurisdictions", type=int, default=4)
+    args = parser.parse_args()
+
+    install(FakeLatencyChatModel(latency=args.latency, respond=mapping_response))
+    part = make_bom(args.nodes)
+    nodes = flatten_bom(part)
+    jurisdiction = make_jurisdiction()
+
+    # Every measured run gets an empty cache, so none is served from the
+    # mappings of the run before it
+    with temporary_caches():
+        start = time.perf_counter()
+        serial = dfs_part_traversal(part, jurisdiction)
+        serial_time = time.perf_counter() - start
+
+    with temporary_caches():
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            [concurrent] = parallel_compliance_check(nodes, [jurisdiction], executor)
+        concurrent_time = time.perf_counter() - start
+
+    print(f"nodes={args.nodes} latency={args.latency}s")
+    print(f"serial:     {serial_time:.2f}s")
+    print(f"concurrent: {concurrent_time:.2f}s (max_concurrency={args.concurrency})")
+    print(f"speedup:    {serial_time / concurrent_time:.1f}x")
+    print(f"identical:  {serial == concurrent}")
+
+    jurisdictions = [
+        make_jurisdiction(f"Jurisdiction {i}", f"J{i}")
+        for i in range(args.jurisdictions)
+    ]
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        with temporary_caches():
+            start = time.perf_counter()
+            one_by_one = [
+                result
+                for jurisdiction in jurisdictions
+                for result in parallel_compliance_check(nodes, [jurisdiction], executor)
+            ]
+            one_by_one_time = time.perf_counter() - start
+
+        with temporary_caches():
+            start = time.perf_counter()
+            fan_out = parallel_compliance_check(nodes, jurisdictions, executor)
+            fan_out_time = time.perf_counter() - start
+
+    print(f"jurisdictions={args.jurisdictions}")
+    print(f"one by one: {one_by_one_time:.2f}s")
+    print(f"fan-out:    {fan_out_time:.2f}s")
+    print(f"identical:  {one_by_one == fan_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+benchmarks/bench_units.py
+
+Microbenchmark of UnitConverter: scalar conversions through the compiled unit
+table against the converter it replaced (copied below), and the vectorized
+convert_many over the same values.
+
+Usage:
+    python -m benchmarks.bench_units --conversions 1000000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from agent.utils.unit_converter import UnitConverter
+
+
+class LegacyUnitConverter:
+    # The converter before the compiled table, stripping units, looking up
+    # categories and rebuilding the concentration aliases on every call
+    FACTORS = {
+        "mg": ("weight", 1e-6),
+        "g": ("weight", 1e-3),
+        "kg": ("weight", 1),
+        "lb": ("weight", 0.45359237),
+        "mm": ("distance", 0.001),
+        "m": ("distance", 1),
+        "%": ("concentration", None),
+        "mg/kg": ("concentration", None),
+        "ppm": ("concentration", None),
+    }
+
+    @classmethod
+    def convert(cls, value: float, from_unit: str, to_unit: str) -> float:
+        from_unit = from_unit.strip()
+        to_unit = to_unit.strip()
+        if from_unit == to_unit:
+            return value
+        if (
+            cls.FACTORS[from_unit][0] == "concentration"
+            or cls.FACTORS[to_unit][0] == "concentration"
+        ):
+            return cls._convert_concentration(value, from_unit, to_unit)
+        cat_from, factor_from = cls.FACTORS[from_unit]
+        cat_to, factor_to = cls.FACTORS[to_unit]
+        if cat_from != cat_to:
+            raise ValueError(f"Incompatible units: {from_unit} vs {to_unit}")
+        base_value = value * factor_from
+        return base_value / factor_to
+
+    @staticmethod
+    def _convert_concentration(value: float, from_unit: str, to_unit: str) -> float:
+        aliases = {"percent": "%", "ppm": "mg/kg"}
+        from_unit = aliases.get(from_unit, from_unit)
+        to_unit = aliases.get(to_unit, to_unit)
+        if from_unit == "%" and to_unit in ("mg/kg", "ppm"):
+            return value * 10000
+        if from_unit in ("mg/kg", "ppm") and to_unit == "%":
+            return value / 10000
+        if from_unit in ("mg/kg", "ppm") and to_unit in ("mg/kg", "ppm"):
+            return value
+        if from_unit == "%" and to_unit == "%":
+            return value
+        raise ValueError(
+            f"Unsupported concentration conversion: {from_unit} -> {to_unit}"
+        )
+
+
+# Unit pairs both converters support, as they appear in part and regulation data
+PAIRS = [
+    ("%", "ppm"),
+    ("ppm", "%"),
+    ("mg/kg", "%"),
+    ("%", "%"),
+    ("ppm", "mg/kg"),
+    ("g", "kg"),
+    ("mg", "g"),
+    ("lb", "kg"),
+    ("mm", "m"),
+    (" % ", "ppm"),
+]
+
+
+def timed(function, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--conversions", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    values = [rng.uniform(0, 2000) for _ in range(args.conversions)]
+    pairs = [rng.choice(PAIRS) for _ in range(args.conversions)]
+    from_units = [from_unit for from_unit, _ in pairs]
+    to_units = [to_unit for _, to_unit in pairs]
+
+    legacy_time, legacy = timed(
+        lambda: [
+            LegacyUnitConverter.convert(value, *pair)
+            for value, pair in zip(values, pairs)
+        ]
+    )
+    compiled_time, compiled = timed(
+        lambda: [
+            UnitConverter.convert(value, *pair) for value, pair in zip(values, pairs)
+        ]
+    )
+    vectorized_time, vectorized = timed(
+        UnitConverter.convert_many, values, from_units, to_units
+    )
+    # The unit columns of a check are usually a handful of distinct units
+    array = np.asarray(values)
+    single_time, single = timed(UnitConverter.convert_many, array, "%", "ppm")
+
+    print(f"conversions={args.conversions} pairs={len(PAIRS)}")
+    print(f"legacy convert:        {legacy_time * 1000:.1f}ms")
+    print(f"compiled convert:      {compiled_time * 1000:.1f}ms")
+    print(f"convert_many:          {vectorized_time * 1000:.1f}ms")
+    print(f"convert_many one pair: {single_time * 1000:.1f}ms")
+    print(f"identical:             {legacy == compiled == vectorized.tolist()}")
+    print(f"identical one pair:    {single.tolist() == [v * 10000 for v in values]}")
+
+
+if __name__ == "__main__":
+    main()
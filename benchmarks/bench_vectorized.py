@@ -0,0 +1,106 @@
+"""
+benchmarks/bench_vectorized.py
+
+Compares check_compliance, called once per part, with the vectorized
+check_compliance_many over the same mappings, and checks that both produce the
+same records. Mappings are processed in chunks so that both result sets of a
+chunk fit in memory at once. The per-mapping debug print of check_compliance
+is part of its cost, stdout is discarded for both engines.
+
+Usage:
+    python -m benchmarks.bench_vectorized --mappings 1000000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+
+# fake_llm sets a dummy API key, so it must be imported before agent modules
+import benchmarks.fake_llm  # noqa: F401
+
+from agent.models import SubstanceMapping
+from agent.operations import check_compliance, check_compliance_many
+from schema import Substance
+
+PART_UNITS = ["%", "ppm", "mg/kg"]
+CONDITIONS = ["lte", "lte", "lte", "gte", "eq", None]
+
+
+def make_jurisdiction_substances(rng: random.Random) -> list[Substance]:
+    return [
+        Substance(
+            name=f"Substance {i}",
+            standardized_name=f"S{i}",
+            value=rng.choice([0.01, 0.1, 1000.0]),
+            unit=rng.choice(["%", "ppm", "mg/kg"]),
+            tolerance_condition=rng.choice(CONDITIONS),
+        )
+        for i in range(20)
+    ]
+
+
+def make_mappings(
+    count: int, per_part: int, jurisdiction: list[Substance], rng: random.Random
+) -> list[list[SubstanceMapping]]:
+    parts = []
+    for _ in range(0, count, per_part):
+        mappings = []
+        for _ in range(per_part):
+            target = rng.choice(jurisdiction)
+            mappings.append(
+                SubstanceMapping.model_construct(
+                    part_substance=Substance.model_construct(
+                        name=target.name,
+                        standardized_name=target.standardized_name,
+                        value=round(rng.uniform(0, 2000), 3),
+                        unit=rng.choice(PART_UNITS),
+                        tolerance_condition=None,
+                    ),
+                    # A few unregulated and non comparable substances as well
+                    jurisidiction_substance=None if rng.random() < 0.05 else target,
+                    is_comparable=rng.random() > 0.05,
+                )
+            )
+        parts.append(mappings)
+    return parts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mappings", type=int, default=1_000_000)
+    parser.add_argument("--per-part", type=int, default=10)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    jurisdiction = make_jurisdiction_substances(rng)
+    scalar_time = vectorized_time = 0.0
+    identical = True
+    done = 0
+    while done < args.mappings:
+        count = min(args.chunk, args.mappings - done)
+        parts = make_mappings(count, args.per_part, jurisdiction, rng)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            start = time.perf_counter()
+            scalar = [check_compliance(mappings) for mappings in parts]
+            scalar_time += time.perf_counter() - start
+            out.truncate(0)
+            start = time.perf_counter()
+            vectorized = check_compliance_many(parts)
+            vectorized_time += time.perf_counter() - start
+        identical = identical and scalar == vectorized
+        done += count
+        print(f"{done}/{args.mappings} mappings", file=os.sys.stderr)
+
+    print(f"mappings={args.mappings} per_part={args.per_part}")
+    print(f"check_compliance:      {scalar_time:.2f}s")
+    print(f"check_compliance_many: {vectorized_time:.2f}s")
+    print(f"speedup:               {scalar_time / vectorized_time:.1f}x")
+    print(f"identical:             {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+benchmarks/fake_llm.py
+
+Local stand-in for the Gemini chat model used by the benchmarks. It answers
+every prompt through a user supplied function after sleeping for a fixed
+latency, so wall-clock numbers reflect scheduling rather than the network.
+`temporary_caches` keeps the fake answers out of the persistent result cache.
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# agent.operations builds the real client at import time, which needs a key
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+
+class FakeLatencyChatModel(BaseChatModel):
+    latency: float = 0.2
+    respond: Callable[[str], str]
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency"
+
+    def _generate(
+        self, messages: list[BaseMessage], stop: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        self.calls += 1
+        prompt = "\n".join(str(m.content) for m in messages)
+        message = AIMessage(content=self.respond(prompt))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def install(llm: FakeLatencyChatModel) -> None:
+    """Swap the module level LLM used by agent.operations for the fake one."""
+    import agent.operations
+
+    agent.operations.llm = llm
+
+
+# The ResultCache instances of agent.operations, also imported by agent.steps
+CACHES = ("mapping_cache", "page_cache", "document_cache")
+
+
+@contextmanager
+def temporary_caches() -> Iterator[None]:
+    """
+    Swap the result caches of agent.operations and agent.steps for empty ones
+    in a temporary file, and restore them on exit. Every benchmark run against
+    the fake LLM must use it: fake answers in the persistent cache would be
+    returned to real compliance checks, and cache hits would skew the timings.
+    """
+    import agent.operations
+    import agent.steps
+    from agent.utils.cache import ResultCache
+
+    modules = [agent.operations, agent.steps]
+    originals = [
+        {name: getattr(module, name) for name in CACHES if hasattr(module, name)}
+        for module in modules
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.sqlite")
+        caches = {
+            name: ResultCache(getattr(agent.operations, name).namespace, path=path)
+            for name in CACHES
+        }
+        for module, saved in zip(modules, originals):
+            for name in saved:
+                setattr(module, name, caches[name])
+        try:
+            yield
+        finally:
+            for module, saved in zip(modules, originals):
+                for name, cache in saved.items():
+                    setattr(module, name, cache)
+            for cache in caches.values():
+                cache.close()
+
+
+SUBSTANCE_REPR = re.compile(
+    r"Substance\(name='([^']*)', standardized_name='([^']*)', value=([^,]*), "
+    r"unit=([^,]*), tolerance_condition=([^)]*)\)"
+)
+
+
+def _parse_substances(text: str) -> list[dict]:
+    substances = []
+    for name, standardized_name, value, unit, condition in SUBSTANCE_REPR.findall(text):
+        substances.append(
+            {
+                "name": name,
+                "standardized_name": standardized_name,
+                "value": None if value == "None" else float(value),
+                "unit": None if unit == "None" else unit.strip("'"),
+                "tolerance_condition": (
+                    None if condition == "None" else condition.strip("'")
+                ),
+            }
+        )
+    return substances
+
+
+def mapping_response(prompt: str) -> str:
+    """
+    Answer a JURISDICTION_PART_SUBSTANCE_MAPPING prompt by matching part and
+    jurisdiction substances on their standardized name.
+    """
+
+    jurisdiction_text, part_text = prompt.split("**Part substances**", 1)
+    part_text = part_text.split("### Your Task", 1)[0]
+    regulated = {
+        s["standardized_name"]: s for s in _parse_substances(jurisdiction_text)
+    }
+    mappings = []
+    for substance in _parse_substances(part_text):
+        match = regulated.get(substance["standardized_name"])
+        mappings.append(
+            {
+                "part_substance": substance,
+                "jurisidiction_substance": match,
+                "is_comparable": match is not None,
+            }
+        )
+    return json.dumps({"mappings": mappings})
+
+
+def batch_mapping_response(prompt: str) -> str:
+    """
+    Answer a JURISDICTION_BATCH_PART_SUBSTANCE_MAPPING prompt, part by part.
+    """
+
+    jurisdiction_text, parts_text = prompt.split("**Parts**", 1)
+    parts_text = parts_text.split("### Your Task", 1)[0]
+    regulated = {
+        s["standardized_name"]: s for s in _parse_substances(jurisdiction_text)
+    }
+    parts = []
+    for part_id, substances in re.findall(
+        r"- part_id: (\S+)\n  substances: (.*)", parts_text
+    ):
+        mappings = []
+        for substance in _parse_substances(substances):
+            match = regulated.get(substance["standardized_name"])
+            mappings.append(
+                {
+                    "part_substance": substance,
+                    "jurisidiction_substance": match,
+                    "is_comparable": match is not None,
+                }
+            )
+        parts.append({"part_id": part_id, "mappings": mappings})
+    return json.dumps({"parts": parts})
+
+
+def any_mapping_response(prompt: str) -> str:
+    """Answer either a batched or a single part substance mapping prompt."""
+    if "**Parts**" in prompt:
+        return batch_mapping_response(prompt)
+    return mapping_response(prompt)
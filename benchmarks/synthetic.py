@@ -0,0 +1,139 @@
+"""
+benchmarks/synthetic.py
+
+Generators for synthetic BOMs, jurisdictions and regulation PDFs used by the
+benchmarks.
+"""
+
+import random
+
+import fitz
+
+from schema import Jurisdiction, Part, Substance
+
+# (name, standardized_name) pairs regulated by the synthetic jurisdiction
+REGULATED = [
+    ("Lead", "Pb"),
+    ("Mercury", "Hg"),
+    ("Cadmium", "Cd"),
+    ("Hexavalent chromium", "Cr(VI)"),
+    ("Polybrominated biphenyls", "PBB"),
+    ("Polybrominated diphenyl ethers", "PBDE"),
+]
+UNREGULATED = [("Tin", "Sn"), ("Copper", "Cu"), ("Aluminium", "Al")]
+
+
+def make_jurisdiction(name: str = "European Union", abbreviation: str = "EU"):
+    return Jurisdiction(
+        name=name,
+        abbreviation=abbreviation,
+        substance_tolerances=[
+            Substance(
+                name=substance_name,
+                standardized_name=standardized_name,
+                value=0.1,
+                unit="%",
+                tolerance_condition="lte",
+            )
+            for substance_name, standardized_name in REGULATED
+        ],
+    )
+
+
+def make_substance(rng: random.Random) -> Substance:
+    name, standardized_name = rng.choice(REGULATED + UNREGULATED)
+    return Substance(
+        name=name,
+        standardized_name=standardized_name,
+        value=round(rng.uniform(0, 2000), 3),
+        unit="mg/kg",
+    )
+
+
+def make_bom(nodes: int, fanout: int = 4, seed: int = 0) -> Part:
+    """Build a BOM with `nodes` parts, each assembly having up to `fanout` children."""
+
+    rng = random.Random(seed)
+    root = Part(id="PART-0", name="Part 0", substances=[make_substance(rng)])
+    queue = [root]
+    created = 1
+    while created < nodes:
+        parent = queue.pop(0)
+        parent.bom = []
+        for _ in range(min(fanout, nodes - created)):
+            child = Part(
+                id=f"PART-{created}",
+                name=f"Part {created}",
+                substances=[make_substance(rng) for _ in range(rng.randint(0, 3))],
+            )
+            parent.bom.append(child)
+            queue.append(child)
+            created += 1
+    return root
+
+
+def make_pdf(
+    path: str, pages: int, seed: int = 0, lines: int = 40, boilerplate: float = 0.0
+) -> str:
+    """
+    Write a regulation-like PDF with `pages` pages of filler text. Every page
+    starts with a "PAGE-<n>" marker and a seed specific line, so PDFs with
+    different seeds never share page text (or page cache entries). A
+    `boilerplate` fraction of the pages carries recital-like prose without any
+    substance limits.
+    """
+
+    rng = random.Random(seed)
+    document = fitz.open()
+    for number in range(pages):
+        page = document.new_page()
+        text = [f"PAGE-{number} seed {seed}"]
+        regulatory = rng.random() >= boilerplate
+        for _ in range(lines):
+            if regulatory:
+                name, _ = rng.choice(REGULATED + UNREGULATED)
+                text.append(
+                    f"{name} shall not exceed {rng.uniform(0, 1):.3f} % by weight "
+                    f"in homogeneous materials, clause {rng.randint(1, 999)}."
+                )
+            else:
+                text.append(
+                    f"Whereas the Commission consulted the committee on point "
+                    f"{rng.randint(1, 999)} and took account of the opinions received."
+                )
+        page.insert_textbox(page.rect + (36, 36, -36, -36), "\n".join(text), fontsize=8)
+    document.save(path)
+    document.close()
+    return path
+
+
+def make_annex_pdf(path: str, pages: int, seed: int = 0, prose: float = 0.0) -> str:
+    """
+    Write a PDF of annex-style limit lists ("Lead (0,1 %)") for the European
+    Union. A `prose` fraction of the pages states the limits in sentences
+    instead, which the annex parser leaves to the LLM.
+    """
+
+    rng = random.Random(seed)
+    document = fitz.open()
+    for number in range(pages):
+        page = document.new_page()
+        text = [
+            f"ANNEX {number} seed {seed}",
+            "Restricted substances and maximum concentration values tolerated by",
+            "weight in homogeneous materials",
+        ]
+        as_prose = rng.random() < prose
+        for name, standardized_name in rng.sample(REGULATED + UNREGULATED, 6):
+            value = f"{rng.choice([0.01, 0.05, 0.1, 0.5])}".replace(".", ",")
+            if as_prose:
+                text.append(f"{name} shall not exceed {value} % by weight.")
+            elif standardized_name.isalpha() and len(standardized_name) > 2:
+                text.append(f"{name} ({standardized_name}) ({value} %)")
+            else:
+                text.append(f"{name} ({value} %)")
+        text.append("Official Journal of the European Union")
+        page.insert_textbox(page.rect + (36, 36, -36, -36), "\n".join(text), fontsize=9)
+    document.save(path)
+    document.close()
+    return path
@@ -15,8 +15,8 @@ load_dotenv()
 
 
 def run_agent(part_file, pdf_file):
-    # Parse Part JSON
-    part = Part.model_validate_json(part_file.read().decode("utf-8"))
+    # Parse Part JSON, from the bytes without decoding them into a second copy
+    part = Part.model_validate_json(part_file.read())
 
     print(f"Running Agent for part: {part.name}")
 